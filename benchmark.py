@@ -0,0 +1,289 @@
+# Reproducible benchmarks, run offline on synthetic resumes and the fake
+# model backend:
+#
+#   python benchmark.py --sizes 10 100 1000 --latency 0.5 --error-rate 0.02
+#
+# Scenarios:
+#   extraction  text extraction per file, then the same files on the process pool
+#   analysis    single-resume analysis as in the student portal (streamed;
+#               reports time to first token as well as the full answer)
+#   screening   the bulk pipeline of the industry portal and CLI: extraction,
+#               pre-ranking, scoring, parsing and the query filter
+#
+# Each scenario reports throughput and p50/p95/p99 latency. Every run writes
+# one JSON file (configuration, git commit, results) so runs can be compared
+# over time. Caches and the resume corpus live in a temporary directory, so
+# runs start cold. Retry backoff for injected errors follows the usual
+# LLM_RETRY_* settings.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from synthetic_resumes import make_resume_pdf
+
+SCENARIOS = ["extraction", "analysis", "screening"]
+DEFAULT_SIZES = [10, 100, 1000]
+BENCHMARK_JD = (
+    "Data engineer with strong Python and SQL. Builds batch and streaming pipelines with Spark, Kafka and Airflow "
+    "on AWS, deploys services with Docker and Kubernetes, and monitors data quality."
+)
+ANALYSIS_PROMPT = (
+    "You are an experienced Technical Human Resource Manager. Review the resume against the job description and "
+    "highlight the strengths and weaknesses of the applicant."
+)
+
+
+def latency_summary(seconds):
+    if not seconds:
+        return {"count": 0}
+    values = np.asarray(seconds) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def scenario_result(name, files, wall_seconds, latencies, **extra):
+    result = {
+        "scenario": name,
+        "files": files,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(files / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency": latency_summary(latencies),
+    }
+    result.update(extra)
+    return result
+
+
+def synthetic_pdfs(count, args, label):
+    # Each scenario gets its own resumes, so one scenario never warms the caches of another
+    return [make_resume_pdf(index, pages=args.pages, words_per_page=args.words_per_page, seed=f"{args.seed}-{label}")
+            for index in range(count)]
+
+
+def rate_delta(before, after):
+    return {key: round(after[key] - before[key], 3) for key in ("calls", "retries", "throttled", "failures",
+                                                                "backoff_seconds")}
+
+
+def bench_extraction(size, args):
+    from pdf_text import extract_many, extract_text
+
+    pdfs = synthetic_pdfs(size, args, f"extraction-{size}")
+    latencies = []
+    start = time.perf_counter()
+    for pdf in pdfs:
+        began = time.perf_counter()
+        extract_text(pdf)
+        latencies.append(time.perf_counter() - began)
+    wall = time.perf_counter() - start
+
+    # The same PDFs again on the process pool, as the industry portal and CLI extract them
+    start = time.perf_counter()
+    results = extract_many(pdfs)
+    pool_wall = time.perf_counter() - start
+    return scenario_result("extraction", size, wall, latencies, pool_wall_seconds=round(pool_wall, 3),
+                           pool_throughput_per_second=round(size / pool_wall, 2) if pool_wall > 0 else None,
+                           errors=sum(error is not None for _, _, error in results),
+                           mean_pdf_bytes=round(sum(map(len, pdfs)) / size))
+
+
+def bench_analysis(backend, args):
+    from llm_backend import stream_text
+    from pdf_text import extract_text
+    from prompt_builder import PromptSection, build_prompt
+    from rate_limit import get_rate_controller
+
+    pdfs = synthetic_pdfs(args.analysis_runs, args, "analysis")
+    rate_before = get_rate_controller(backend.name).stats()
+    latencies = []
+    first_token = []
+    errors = 0
+    start = time.perf_counter()
+    for pdf in pdfs:
+        began = time.perf_counter()
+        request = build_prompt([
+            PromptSection("jd", BENCHMARK_JD, heading="Job Description"),
+            PromptSection("candidate", extract_text(pdf), heading="Candidate Details", truncatable=True),
+            PromptSection("instructions", ANALYSIS_PROMPT, heading="Instructions"),
+        ])
+        try:
+            for _ in stream_text(request.text, backend):
+                if len(first_token) < len(latencies) + 1:
+                    first_token.append(time.perf_counter() - began)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - began)
+    wall = time.perf_counter() - start
+    return scenario_result("analysis", len(pdfs), wall, latencies, time_to_first_token=latency_summary(first_token),
+                           errors=errors, rate=rate_delta(rate_before, get_rate_controller(backend.name).stats()))
+
+
+def bench_screening(size, backend, args):
+    import pandas as pd
+
+    from llm_backend import generate_text
+    from pdf_text import extract_many
+    from rate_limit import get_rate_controller
+    from result_filters import compile_query
+    from screening import ScreeningJob
+
+    pdfs = synthetic_pdfs(size, args, f"screening-{size}")
+    rate_before = get_rate_controller(backend.name).stats()
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def generate(prompt, schema=None):
+        # One model request, including any retries
+        began = time.perf_counter()
+        try:
+            return generate_text(prompt.text, backend, schema=schema)
+        finally:
+            with latencies_lock:
+                latencies.append(time.perf_counter() - began)
+
+    stages = {}
+    start = time.perf_counter()
+    extractions = extract_many(pdfs)
+    resumes = [(f"resume_{index:05d}.pdf", text) for index, (_, text, error) in enumerate(extractions)
+               if error is None and text]
+    stages["extract"] = time.perf_counter() - start
+
+    began = time.perf_counter()
+    # The JD names the size so that runs of different sizes do not share cached answers
+    job = ScreeningJob(f"{BENCHMARK_JD}\n(benchmark run of {size} resumes)", max_workers=args.workers,
+                       batch_size=args.batch_size or None, generate=generate)
+    candidates, skipped = job.prepare(resumes)
+    stages["prepare"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    rows = []
+    errors = 0
+    parse_errors = 0
+    for outcome in job.iter_scored(candidates):
+        if not outcome.ok:
+            errors += 1
+            continue
+        row, parse_error = job.evaluate(outcome.item, outcome.value)
+        parse_errors += parse_error is not None
+        rows.append(row)
+    stages["score"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    matched = compile_query(args.query).apply(pd.DataFrame(rows)) if rows else []
+    stages["filter"] = time.perf_counter() - began
+    wall = time.perf_counter() - start
+
+    return scenario_result("screening", size, wall, latencies, requests=len(latencies),
+                           stage_seconds={stage: round(seconds, 3) for stage, seconds in stages.items()},
+                           scored=len(rows), matched=len(matched), skipped_prerank=len(skipped), errors=errors,
+                           parse_errors=parse_errors,
+                           rate=rate_delta(rate_before, get_rate_controller(backend.name).stats()))
+
+
+def git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_result(result):
+    latency = result["latency"]
+    line = (f"{result['scenario']:<10} {result['files']:>6} files  {result['wall_seconds']:>8.2f}s  "
+            f"{result['throughput_per_second'] or 0:>8.2f}/s")
+    if latency["count"]:
+        line += f"  p50 {latency['p50_ms']:.1f} ms  p95 {latency['p95_ms']:.1f} ms  p99 {latency['p99_ms']:.1f} ms"
+    return line
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction, analysis and bulk screening offline.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Scenarios to run")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES,
+                        help="Resume counts for the extraction and screening scenarios (default: %(default)s)")
+    parser.add_argument("--analysis-runs", type=int, default=20,
+                        help="Resumes analysed one after another in the analysis scenario (default: %(default)s)")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per synthetic resume (default: %(default)s)")
+    parser.add_argument("--words-per-page", type=int, default=350, help="Words per page (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake model latency in seconds (default: %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.2,
+                        help="Latency variation as a fraction of --latency (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of fake model calls that fail with 429/503 (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent requests (default: SCREENING_MAX_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=0, help="Resumes per screening request; 0 = one each")
+    parser.add_argument("--query", default="ATS >= 50 sort by ATS desc", help="Query applied to screening results")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic resumes and the fake model")
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: benchmark_results/bench-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or os.path.join("benchmark_results", time.strftime("bench-%Y%m%d-%H%M%S.json"))
+
+    # Caches are read from the environment at import, so the project modules
+    # are imported only after pointing them at an empty directory
+    scratch = tempfile.TemporaryDirectory(prefix="resume-bench-")
+    os.environ["PDF_TEXT_CACHE_DIR"] = os.path.join(scratch.name, "pdf_text")
+    os.environ["LLM_CACHE_PATH"] = os.path.join(scratch.name, "llm_responses.sqlite3")
+    os.environ["RESUME_CORPUS_DIR"] = os.path.join(scratch.name, "resume_corpus")
+    from llm_backend import FakeBackend
+    from screening import DEFAULT_MAX_WORKERS
+
+    args.workers = args.workers or DEFAULT_MAX_WORKERS
+    backend = FakeBackend(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+
+    results = []
+    with scratch:
+        for scenario in args.scenarios:
+            if scenario == "analysis":
+                runs = [lambda: bench_analysis(backend, args)]
+            elif scenario == "extraction":
+                runs = [lambda size=size: bench_extraction(size, args) for size in args.sizes]
+            else:
+                runs = [lambda size=size: bench_screening(size, backend, args) for size in args.sizes]
+            for run in runs:
+                result = run()
+                print(format_result(result), file=sys.stderr)
+                results.append(result)
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Cold-start import check for the Streamlit entry point, e.g. in CI or before
+# building the container image:
+#
+#   python check_import_time.py --budget-ms 1000
+#
+# Imports main.py in fresh interpreters and reports the best wall time, the
+# slowest modules (from `python -X importtime`) and any heavy dependency that
+# was loaded before a portal was entered. Exits with status 1 when the import
+# is over budget or a heavy module is imported eagerly.
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Only the portals need these; importing main.py must not load them
+HEAVY_MODULES = ["google.generativeai", "pandas", "PyPDF2", "numpy", "pyarrow", "openpyxl"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure(repeat):
+    # (best seconds, eagerly loaded heavy modules) over several fresh interpreters
+    here = os.path.dirname(os.path.abspath(__file__))
+    best, loaded = None, []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES)], cwd=here,
+                                capture_output=True, text=True, check=True).stdout.split()
+        elapsed = float(output[0])
+        loaded = output[1].split(",") if len(output) > 1 else []
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+def slowest_modules(count):
+    # [(cumulative microseconds, module)] from `python -X importtime`, slowest first
+    here = os.path.dirname(os.path.abspath(__file__))
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=here,
+                            capture_output=True, text=True, check=True).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        timings.append((int(cumulative), module.strip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the cold-start import time of main.py.")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000")),
+                        help="Maximum import time in milliseconds (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to take the best of (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    elapsed, loaded = measure(max(1, args.repeat))
+    print(f"import main: {elapsed * 1000:.0f} ms (budget {args.budget_ms:g} ms)")
+    if args.top:
+        print("Slowest imports (cumulative):")
+        for microseconds, module in slowest_modules(args.top):
+            print(f"  {microseconds / 1000:8.1f} ms  {module}")
+
+    failed = False
+    if loaded:
+        print(f"Heavy modules imported at startup: {', '.join(loaded)}", file=sys.stderr)
+        failed = True
+    if elapsed * 1000 > args.budget_ms:
+        print(f"Import time is over the budget by {elapsed * 1000 - args.budget_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
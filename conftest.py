@@ -0,0 +1,2 @@
+# The modules live at the top of the repository; this file makes pytest put
+# it on sys.path so the tests under tests/ can import them directly.
@@ -0,0 +1,94 @@
+# In-memory export of screening results.
+# Every format is built in a BytesIO buffer, so nothing is written to the
+# working directory and concurrent sessions cannot overwrite each other's
+# files. Rows are streamed from the DataFrame one at a time instead of
+# building converted copies of it.
+
+import csv
+import io
+import time
+import uuid
+
+from openpyxl import Workbook
+
+from metrics import timed
+
+EXPORT_FORMATS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def new_job_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def export_value(value):
+    # Flatten values that spreadsheets and Parquet cannot hold as-is
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return ", ".join(f"{key}: {item}" for key, item in value.items())
+    return value
+
+
+def _rows(df):
+    for row in df.itertuples(index=False, name=None):
+        yield [export_value(value) for value in row]
+
+
+def to_excel_bytes(df, sheet_name="Results"):
+    # Write-only workbooks stream rows to the file instead of keeping every cell object in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(column) for column in df.columns])
+    for row in _rows(df):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def to_csv_bytes(df):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(df.columns)
+    writer.writerows(_rows(df))
+    return buffer.getvalue().encode("utf-8")
+
+
+def to_parquet_bytes(df):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from result_filters import NUMERIC_FIELDS
+
+    # Scores and CGPA are stored as nullable floats, coerced like the result
+    # filters read them ("N/A" becomes null); the other columns as text
+    columns = {
+        str(column): pa.array(pd.to_numeric(df[column], errors="coerce"), type=pa.float64(), from_pandas=True)
+        if column in NUMERIC_FIELDS else pa.array(
+            [None if value is None else str(export_value(value)) for value in df[column]],
+            type=pa.string(),
+        )
+        for column in df.columns
+    }
+    buffer = io.BytesIO()
+    pq.write_table(pa.table(columns), buffer)
+    return buffer.getvalue()
+
+
+EXPORTERS = {
+    "Excel": to_excel_bytes,
+    "CSV": to_csv_bytes,
+    "Parquet": to_parquet_bytes,
+}
+
+
+@timed("export")
+def export_results(df, export_format, job_id, prefix="Industry_Results"):
+    # (data, file_name, mime) ready for st.download_button
+    extension, mime = EXPORT_FORMATS[export_format]
+    return EXPORTERS[export_format](df), f"{prefix}_{job_id}.{extension}", mime
@@ -0,0 +1,157 @@
+# Deterministic extraction of structured candidate fields from resume text.
+# Email, CGPA, College and Certifications are found with regexes and a small
+# institution list; each value comes with a confidence score so callers only
+# ask the LLM for the fields that could not be found reliably.
+
+import re
+
+CONFIDENCE_THRESHOLD = 0.75
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+CGPA_PATTERNS = [
+    # "CGPA: 8.5", "CGPA - 8.50/10", "GPA 3.7 / 4.0"
+    re.compile(r"\b(?:C\.?G\.?P\.?A|S\.?G\.?P\.?A|GPA|CPI)\b\s*(?:of|:|-|=)?\s*(\d{1,2}(?:\.\d{1,2})?)\s*(?:/\s*(\d{1,2}(?:\.\d{1,2})?))?", re.IGNORECASE),
+    # "8.5/10 CGPA", "8.5 CGPA"
+    re.compile(r"(\d{1,2}(?:\.\d{1,2})?)\s*(?:/\s*(\d{1,2}(?:\.\d{1,2})?))?\s*(?:C\.?G\.?P\.?A|GPA|CPI)\b", re.IGNORECASE),
+]
+
+KNOWN_INSTITUTIONS = [
+    "Indian Institute of Technology",
+    "National Institute of Technology",
+    "Indian Institute of Information Technology",
+    "Birla Institute of Technology",
+    "Delhi Technological University",
+    "Netaji Subhas University of Technology",
+    "Jadavpur University",
+    "Anna University",
+    "Vellore Institute of Technology",
+    "Manipal Institute of Technology",
+    "Meghnad Saha Institute of Technology",
+    "Heritage Institute of Technology",
+    "Institute of Engineering and Management",
+    "Techno India University",
+    "Maulana Abul Kalam Azad University of Technology",
+    "University of Calcutta",
+    "University of Delhi",
+    "University of Mumbai",
+    "Amity University",
+    "SRM Institute of Science and Technology",
+]
+
+INSTITUTION_ABBREVIATIONS = re.compile(r"\b(IIT|NIT|IIIT|BITS|VIT|DTU|NSUT|MSIT|IEM|MAKAUT)\b(?:[ \t,-]+([A-Z][a-z]+))?")
+
+GENERIC_INSTITUTION_PATTERN = re.compile(
+    r"((?:[A-Z][A-Za-z.&'-]*[ \t]+){0,6}(?:University|Institute|College)(?:[ \t]+of(?:[ \t]+[A-Z][A-Za-z.&'-]*){1,5})?)"
+)
+
+CERTIFICATION_HEADING = re.compile(r"^\s*(?:licenses\s*(?:&|and)\s*)?certifications?\b[\s:]*$", re.IGNORECASE)
+SECTION_HEADING = re.compile(
+    r"^\s*(?:education|academics?|(?:work\s+|professional\s+)?experience|internships?|projects?|(?:technical\s+)?skills|"
+    r"achievements?|awards?|publications?|interests|hobbies|languages|extra[\s-]?curricular\s+activities|summary|"
+    r"objective|references|declaration|positions?\s+of\s+responsibility)\b[\s:]*$",
+    re.IGNORECASE,
+)
+CERTIFICATION_LINE = re.compile(r"\b(?:certified|certification|certificate)\b", re.IGNORECASE)
+
+
+class Field:
+    def __init__(self, value="N/A", confidence=0.0):
+        self.value = value
+        self.confidence = confidence
+
+    @property
+    def confident(self):
+        return self.confidence >= CONFIDENCE_THRESHOLD
+
+    def __repr__(self):
+        return f"Field({self.value!r}, {self.confidence:.2f})"
+
+
+def extract_email(text):
+    emails = list(dict.fromkeys(match.lower() for match in EMAIL_PATTERN.findall(text)))
+    if not emails:
+        return Field()
+    return Field(emails[0], 1.0 if len(emails) == 1 else 0.8)
+
+
+def extract_cgpa(text):
+    for pattern in CGPA_PATTERNS:
+        for match in pattern.finditer(text):
+            value = float(match.group(1))
+            scale = float(match.group(2)) if match.group(2) else None
+            if scale is not None and 0 < value <= scale <= 10:
+                return Field(value, 0.95)
+            if scale is None and 0 < value <= 10:
+                return Field(value, 0.85)
+    return Field()
+
+
+def extract_college(text):
+    lowered = text.lower()
+    for institution in KNOWN_INSTITUTIONS:
+        start = lowered.find(institution.lower())
+        if start != -1:
+            # Keep the campus suffix, e.g. "Indian Institute of Technology Delhi"
+            line_end = text.find("\n", start)
+            line = text[start:line_end if line_end != -1 else len(text)]
+            name = re.split(r"\s*[|,(–—]|\s+-\s+|\s{2,}", line)[0].strip()
+            return Field(name, 0.9)
+    match = INSTITUTION_ABBREVIATIONS.search(text)
+    if match:
+        name = match.group(1) + (" " + match.group(2) if match.group(2) else "")
+        return Field(name, 0.8)
+    match = GENERIC_INSTITUTION_PATTERN.search(text)
+    if match:
+        return Field(match.group(1).strip(), 0.6)
+    return Field()
+
+
+def extract_certifications(text):
+    lines = text.splitlines()
+    certifications = []
+    for i, line in enumerate(lines):
+        if CERTIFICATION_HEADING.match(line):
+            for item in lines[i + 1:]:
+                if not item.strip():
+                    if certifications:
+                        break
+                    continue
+                if SECTION_HEADING.match(item):
+                    break
+                certifications.append(item.strip(" \t-•*●"))
+            if certifications:
+                return Field(certifications[:10], 0.8)
+    certifications = [line.strip(" \t-•*●") for line in lines if CERTIFICATION_LINE.search(line)]
+    if certifications:
+        return Field(certifications, 0.6)
+    return Field()
+
+
+def split_sections(text):
+    # Map of lower-case section heading -> section text, in resume order; the
+    # lines before the first recognised heading (name, contact) are "header"
+    sections = {}
+    heading = "header"
+    lines = []
+    for line in text.splitlines():
+        if SECTION_HEADING.match(line) or CERTIFICATION_HEADING.match(line):
+            if any(item.strip() for item in lines):
+                sections[heading] = (sections.get(heading, "") + "\n" + "\n".join(lines)).strip()
+            heading = " ".join(line.strip(" \t:").lower().split())
+            lines = []
+        else:
+            lines.append(line)
+    if any(item.strip() for item in lines):
+        sections[heading] = (sections.get(heading, "") + "\n" + "\n".join(lines)).strip()
+    return sections
+
+
+def extract_fields(text):
+    # Map of result column name -> Field
+    return {
+        "Candidate Email": extract_email(text),
+        "CGPA": extract_cgpa(text),
+        "College": extract_college(text),
+        "Certifications": extract_certifications(text),
+    }
@@ -0,0 +1,139 @@
+# Tolerant parsing of JSON answers from the model.
+# Even in JSON mode, answers sometimes come wrapped in Markdown fences or
+# prose, or with small defects (trailing commas, smart or single quotes,
+# Python literals, a cut-off end). These are repaired locally so that the
+# paid call still yields a record instead of a parsing error.
+
+import json
+import re
+
+from metrics import timed
+
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+PYTHON_LITERALS = re.compile(r"\b(True|False|None)\b")
+PYTHON_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*$')
+
+
+def clean_json_response(response_text):
+    cleaned = response_text.strip()
+    # Remove markdown code fences if present (e.g., ```json ... ``` )
+    if cleaned.startswith("```"):
+        lines = cleaned.splitlines()
+        if lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        cleaned = "\n".join(lines)
+    return cleaned
+
+
+def _outermost(text):
+    # The span from the first opening bracket to its matching close (or to
+    # the end of the text when the answer was cut off)
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def _close_brackets(text):
+    # Close objects and arrays left open by a truncated answer. A string cut
+    # off by the end is dropped rather than closed, together with any list
+    # it was part of, so a partial value never passes for the real one; its
+    # key is then dropped as well and counts as missing.
+    stack = []
+    in_string = False
+    escaped = False
+    string_start = 0
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            string_start = i
+        elif char in "{[":
+            stack.append(("}" if char == "{" else "]", i))
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        cut = string_start
+        while len(stack) > 1 and stack[-1][0] == "]" and any(closer == "}" for closer, _ in stack[:-1]):
+            cut = stack.pop()[1]
+        text = text[:cut]
+    text = re.sub(r"[,:]\s*$", "", text.rstrip())
+    if stack and stack[-1][0] == "}":
+        # Drop a key whose value never arrived
+        text = DANGLING_KEY.sub(r"\1", text)
+    return text + "".join(closer for closer, _ in reversed(stack))
+
+
+def _repairs(text):
+    # Successively more invasive rewrites of the answer
+    text = text.translate(SMART_QUOTES)
+    yield text
+    text = TRAILING_COMMA.sub(r"\1", text)
+    yield text
+    text = PYTHON_LITERALS.sub(lambda match: PYTHON_TO_JSON[match.group(1)], text)
+    yield text
+    if '"' not in text:
+        text = text.replace("'", '"')
+        yield text
+    closed = _close_brackets(text)
+    yield TRAILING_COMMA.sub(r"\1", closed)
+
+
+@timed("json_parse")
+def parse_json(response_text):
+    # Parse a JSON value out of a model answer, repairing common defects;
+    # raises ValueError when nothing usable can be recovered
+    cleaned = clean_json_response(response_text)
+    try:
+        return json.loads(cleaned)
+    except ValueError as e:
+        error = e
+    candidate = _outermost(cleaned)
+    if candidate is None:
+        raise ValueError(f"No JSON found in the response: {error}")
+    for repaired in _repairs(candidate):
+        try:
+            return json.loads(repaired)
+        except ValueError:
+            continue
+    raise ValueError(f"Could not repair the JSON in the response: {error}")
+
+
+def parse_json_object(response_text):
+    value = parse_json(response_text)
+    # A one-element array holding the object is accepted as the object
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if not isinstance(value, dict):
+        raise ValueError("Expected a JSON object")
+    return value
@@ -0,0 +1,221 @@
+# Text generation backends shared by both portals and the CLI.
+# One client per (backend, model) is created for the whole process and reused
+# by every session and worker thread, instead of configuring the SDK and
+# building a model object on every call. The backend and model are chosen
+# with LLM_BACKEND ("gemini" or "fake") and LLM_MODEL; the fake backend
+# answers deterministically after a fixed delay, so the whole pipeline can be
+# run and benchmarked without network access or an API key.
+#
+# A JSON schema (OpenAPI subset, as accepted by Gemini's response_schema) can
+# be passed with a request to get schema-constrained JSON output. Free-text
+# answers can also be streamed chunk by chunk with stream_text.
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from llm_cache import cached_response, get_llm_cache, request_key
+from metrics import record_cache_hit, record_tokens, span
+from prompt_builder import estimate_tokens
+from rate_limit import get_rate_controller
+
+DEFAULT_BACKEND = "gemini"
+DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_FAKE_LATENCY_SECONDS = 0.5
+
+
+class LLMBackendError(RuntimeError):
+    pass
+
+
+class FakeBackendError(RuntimeError):
+    # Injected failure of the fake backend, shaped like an API error: code
+    # 429 (rate limited) or 503 (unavailable), both retried by rate_limit
+
+    def __init__(self, code):
+        super().__init__(f"Injected fake backend error {code}")
+        self.code = code
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, model_name=DEFAULT_MODEL, api_key=None):
+        # Imported here so that pages which never call the model do not pay for the SDK import
+        import google.generativeai as genai
+
+        api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise LLMBackendError("GOOGLE_API_KEY not set in the environment variables!")
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt_text, schema=None):
+        if schema is None:
+            response = self._model.generate_content(prompt_text)
+        else:
+            generation_config = {"response_mime_type": "application/json", "response_schema": schema}
+            response = self._model.generate_content(prompt_text, generation_config=generation_config)
+        _record_usage(getattr(response, "usage_metadata", None))
+        return response.text
+
+    def stream(self, prompt_text):
+        usage = None
+        for chunk in self._model.generate_content(prompt_text, stream=True):
+            # Usage is reported with the chunks; the last one has the totals
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if chunk.parts:
+                yield chunk.text
+        _record_usage(usage)
+
+
+def _record_usage(usage):
+    record_tokens(getattr(usage, "prompt_token_count", 0), getattr(usage, "candidates_token_count", 0))
+
+
+class FakeBackend:
+    # Offline stand-in for the real model. Answers depend only on the prompt,
+    # and are shaped like what the screening and student prompts ask for:
+    # a JSON array for batch requests, a JSON object for JSON requests and
+    # Markdown otherwise. String fields that an object schema asks for and
+    # the screening answer lacks are filled with placeholder Markdown.
+    #
+    # For benchmarks, each call's latency can vary by +/- jitter (a fraction
+    # of the latency), and a share of calls (error_rate) fails with a 429 or
+    # 503 error after waiting.
+    name = "fake"
+
+    def __init__(self, model_name="fake", latency=None, jitter=None, error_rate=None, seed=None):
+        self.model_name = model_name
+        if latency is None:
+            latency = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", str(DEFAULT_FAKE_LATENCY_SECONDS)))
+        if jitter is None:
+            jitter = float(os.getenv("FAKE_LLM_LATENCY_JITTER", "0"))
+        if error_rate is None:
+            error_rate = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _wait(self):
+        # Sleep for one call's latency, then fail if this call drew an error
+        with self._random_lock:
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            code = self._random.choice((429, 503))
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise FakeBackendError(code)
+
+    def _entry(self, prompt_text, name=""):
+        score = int(hashlib.sha256(f"{name}\x00{prompt_text}".encode("utf-8")).hexdigest()[:8], 16) % 101
+        return {
+            "ATS Score": score,
+            "College": "N/A",
+            "CGPA": "N/A",
+            "Certifications": "N/A",
+            "Candidate Email": "N/A",
+        }
+
+    def generate(self, prompt_text, schema=None):
+        self._wait()
+        answer = self._answer(prompt_text, schema)
+        record_tokens(estimate_tokens(prompt_text), estimate_tokens(answer))
+        return answer
+
+    def stream(self, prompt_text):
+        # The same answer as generate(), one word at a time; the call's
+        # latency is spent before the first word (time to first token)
+        self._wait()
+        answer = self._answer(prompt_text)
+        for word in re.findall(r"\S+\s*", answer):
+            yield word
+        record_tokens(estimate_tokens(prompt_text), estimate_tokens(answer))
+
+    def _answer(self, prompt_text, schema=None):
+        if "JSON array" in prompt_text:
+            names = re.findall(r'^Resume "(.+)":$', prompt_text, re.MULTILINE)
+            return json.dumps([dict(self._entry(prompt_text, name), **{"File Name": name}) for name in names])
+        if "JSON" in prompt_text:
+            entry = self._entry(prompt_text)
+            if schema is not None and schema.get("type") == "object":
+                for key, field in schema.get("properties", {}).items():
+                    if key not in entry and field.get("type") == "string":
+                        entry[key] = f"## {key}\n\nGenerated offline."
+            return json.dumps(entry)
+        digest = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()[:12]
+        return f"## Fake response {digest}\n\nGenerated offline for a prompt of {len(prompt_text)} characters."
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None, model_name=None):
+    # Process-wide client for the configured backend and model, created on
+    # first use. Raises LLMBackendError when the backend cannot be set up
+    # (e.g. the API key is missing).
+    name = name or os.getenv("LLM_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise LLMBackendError(f"Unknown LLM backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    model_name = model_name or os.getenv("LLM_MODEL") or (DEFAULT_MODEL if name == "gemini" else name)
+    with _backends_lock:
+        backend = _backends.get((name, model_name))
+        if backend is None:
+            backend = _backends[(name, model_name)] = BACKENDS[name](model_name)
+        return backend
+
+
+def generate_text(prompt_text, backend=None, schema=None):
+    # Served from the shared response cache when the same request was made
+    # before; otherwise called under the backend's rate controller, which
+    # retries rate limits and transient errors
+    backend = backend or get_backend()
+    controller = get_rate_controller(backend.name)
+    parts = [prompt_text] if schema is None else [prompt_text, json.dumps(schema, sort_keys=True)]
+    called = []
+
+    def call():
+        called.append(True)
+        with span("api_wait"):
+            return controller.call(backend.generate, prompt_text, schema=schema)
+
+    response = cached_response(f"{backend.name}:{backend.model_name}", parts, call)
+    if not called:
+        record_cache_hit()
+    return response
+
+
+def stream_text(prompt_text, backend=None):
+    # Generator of answer chunks as the model produces them, for showing long
+    # answers while they are written. A cached answer is yielded whole; a new
+    # one is stored under the same key as generate_text once it is complete.
+    backend = backend or get_backend()
+    model_name = f"{backend.name}:{backend.model_name}"
+    cache = get_llm_cache()
+    key = request_key(model_name, [prompt_text])
+    response = cache.get(key)
+    if response is not None:
+        record_cache_hit()
+        yield response
+        return
+    chunks = []
+    # Includes the time the caller spends rendering each chunk
+    with span("api_wait"):
+        for chunk in get_rate_controller(backend.name).stream(backend.stream, prompt_text):
+            chunks.append(chunk)
+            yield chunk
+    cache.put(key, model_name, "".join(chunks))
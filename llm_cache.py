@@ -0,0 +1,148 @@
+# Durable cache of LLM responses shared by the student and industry portals.
+# Responses are stored in SQLite (WAL mode, so concurrent Streamlit sessions
+# can read while another writes) keyed by a hash of the model name and the
+# normalized request parts. Entries expire after a TTL and the store is kept
+# under a size budget by evicting the least recently used rows.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "128"))
+
+
+def normalize_part(part):
+    # Whitespace differences (trailing spaces, CRLF, indentation of prompt
+    # templates) should not produce a different cache key
+    return " ".join(str(part).split())
+
+
+def request_key(model_name, parts):
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(normalize_part(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_HOURS * 3600,
+                 max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _connect(self):
+        # One connection per thread; SQLite connections must not be shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+            (key, now - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with conn:
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def put(self, key, model_name, response):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until the store is at 90% of its budget
+        excess = total - int(self.max_bytes * 0.9)
+        stale_keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def stats(self):
+        conn = self._connect()
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "size_bytes": size,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    # Process-wide cache instance shared by both portals
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def cached_response(model_name, parts, generate):
+    # Return the stored response for this request, calling generate() only on a miss
+    cache = get_llm_cache()
+    key = request_key(model_name, parts)
+    response = cache.get(key)
+    if response is None:
+        response = generate()
+        cache.put(key, model_name, response)
+    return response
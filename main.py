@@ -1,6 +1,17 @@
+import importlib
 import streamlit as st
-from single_pdf import student_portal
-from multiple_pdf import industry_portal
+
+# Portal pages by session page name: (module, entry function). Each module is
+# only imported when its page is first entered, so the home page renders
+# without loading Gemini, pandas or PyPDF2.
+PORTALS = {
+    "student": ("single_pdf", "student_portal"),
+    "industry": ("multiple_pdf", "industry_portal"),
+}
+
+def load_portal(page):
+    module_name, function_name = PORTALS[page]
+    return getattr(importlib.import_module(module_name), function_name)
 
 def set_custom_style():
     st.markdown("""
@@ -166,11 +177,8 @@ def main():
             """)
     
     # Display the corresponding page based on the session state
-    elif st.session_state.page == "student":
-        student_portal()
-    
-    elif st.session_state.page == "industry":
-        industry_portal()
+    elif st.session_state.page in PORTALS:
+        load_portal(st.session_state.page)()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,237 @@
+# Per-stage timing and token usage of a portal or CLI run.
+# A run is started by the portal (one per screening or student request) and
+# is visible to everything called from that thread, and from worker threads
+# started with contextvars.copy_context(). The shared modules time their own
+# stages with span()/timed() (PDF parse, prompt build, API wait, JSON parse,
+# export), and backends report token usage from the response metadata.
+# Outside a run these calls do nothing.
+#
+# Finished runs are appended to a JSONL file (METRICS_JSONL_PATH, one object
+# per run) and, when METRICS_PROMETHEUS_PATH is set, process totals are
+# written there in the Prometheus text format for the node exporter's
+# textfile collector. The Prometheus totals cover the current process.
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", os.path.join(".cache", "metrics", "runs.jsonl"))
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")
+# Optional prices (per million tokens) for a cost estimate of each run
+LLM_PRICE_INPUT_PER_MILLION = float(os.getenv("LLM_PRICE_INPUT_PER_MILLION", "0"))
+LLM_PRICE_OUTPUT_PER_MILLION = float(os.getenv("LLM_PRICE_OUTPUT_PER_MILLION", "0"))
+
+_current_run = contextvars.ContextVar("metrics_run", default=None)
+_NO_SPAN = contextlib.nullcontext()
+
+
+class MetricsRun:
+    # Totals for one run. Stage times from worker threads add up, so a
+    # stage can take longer in total than the run's wall time.
+
+    def __init__(self, portal, label=None):
+        self.portal = portal
+        self.label = label
+        self.started_at = time.time()
+        self.wall_seconds = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        # stage -> [seconds, count]
+        self.stages = {}
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.api_calls = 0
+        self.cache_hits = 0
+        self._token = None
+
+    def add(self, stage, seconds):
+        with self._lock:
+            totals = self.stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    def add_tokens(self, prompt_tokens, output_tokens):
+        with self._lock:
+            self.api_calls += 1
+            self.prompt_tokens += prompt_tokens or 0
+            self.output_tokens += output_tokens or 0
+
+    def add_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def summary(self):
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start
+        with self._lock:
+            record = {
+                "portal": self.portal,
+                "label": self.label,
+                "started_at": self.started_at,
+                "wall_seconds": round(wall, 4),
+                "stages": {stage: {"seconds": round(seconds, 4), "count": count}
+                           for stage, (seconds, count) in self.stages.items()},
+                "api_calls": self.api_calls,
+                "cache_hits": self.cache_hits,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+            }
+        if LLM_PRICE_INPUT_PER_MILLION or LLM_PRICE_OUTPUT_PER_MILLION:
+            record["estimated_cost"] = round((record["prompt_tokens"] * LLM_PRICE_INPUT_PER_MILLION
+                                              + record["output_tokens"] * LLM_PRICE_OUTPUT_PER_MILLION) / 1e6, 6)
+        return record
+
+
+class _Span:
+    __slots__ = ("run", "stage", "start")
+
+    def __init__(self, run, stage):
+        self.run = run
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.run.add(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def span(stage):
+    # Context manager that adds its duration to the current run's stage
+    run = _current_run.get()
+    return _NO_SPAN if run is None else _Span(run, stage)
+
+
+def timed(stage):
+    # Decorator form of span() for functions that are one stage
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_tokens(prompt_tokens, output_tokens):
+    # One model call and its token usage, as reported by the backend
+    run = _current_run.get()
+    if run is not None:
+        run.add_tokens(prompt_tokens, output_tokens)
+
+
+def record_cache_hit():
+    run = _current_run.get()
+    if run is not None:
+        run.add_cache_hit()
+
+
+def start_run(portal, label=None):
+    run = MetricsRun(portal, label)
+    run._token = _current_run.set(run)
+    return run
+
+
+def finish_run(run):
+    # Stop the run, write it to the sinks and return its summary. Runs in
+    # which nothing was timed (e.g. a rerun that only redrew the page) are
+    # not recorded.
+    run.wall_seconds = time.perf_counter() - run._start
+    try:
+        _current_run.reset(run._token)
+    except ValueError:
+        # Finished from a different context than it was started in
+        _current_run.set(None)
+    record = run.summary()
+    if record["stages"] or record["api_calls"]:
+        _write(record)
+    return record
+
+
+@contextlib.contextmanager
+def track(portal, label=None):
+    # start_run()/finish_run() around a block; the run is recorded even when
+    # the block raises, and its summary() stays available afterwards
+    run = start_run(portal, label)
+    try:
+        yield run
+    finally:
+        finish_run(run)
+
+
+def diagnostics_rows(record):
+    # Stage breakdown of a run summary as table rows, slowest stage first
+    wall = record["wall_seconds"] or 1
+    return [
+        {"Stage": stage, "Seconds": round(totals["seconds"], 3), "Count": totals["count"],
+         "Share of Wall Time": f"{totals['seconds'] / wall:.0%}"}
+        for stage, totals in sorted(record["stages"].items(), key=lambda item: -item[1]["seconds"])
+    ]
+
+
+def diagnostics_summary(record):
+    line = (f"Wall time {record['wall_seconds']:.2f}s (stage times add up across worker threads); "
+            f"{record['api_calls']} API calls, {record['cache_hits']} served from cache; "
+            f"{record['prompt_tokens']} prompt + {record['output_tokens']} output tokens")
+    if "estimated_cost" in record:
+        line += f"; estimated cost ${record['estimated_cost']:.4f}"
+    return line
+
+
+_sink_lock = threading.Lock()
+# (portal, stage) -> [seconds, count]; portal -> {"runs", "prompt_tokens", ...}
+_stage_totals = {}
+_portal_totals = {}
+
+
+def _write(record):
+    with _sink_lock:
+        if METRICS_JSONL_PATH:
+            directory = os.path.dirname(METRICS_JSONL_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(METRICS_JSONL_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        if METRICS_PROMETHEUS_PATH:
+            portal = record["portal"]
+            for stage, totals in record["stages"].items():
+                stage_totals = _stage_totals.setdefault((portal, stage), [0.0, 0])
+                stage_totals[0] += totals["seconds"]
+                stage_totals[1] += totals["count"]
+            portal_totals = _portal_totals.setdefault(portal, dict.fromkeys(
+                ("runs", "wall_seconds", "api_calls", "cache_hits", "prompt_tokens", "output_tokens"), 0))
+            portal_totals["runs"] += 1
+            for key in ("wall_seconds", "api_calls", "cache_hits", "prompt_tokens", "output_tokens"):
+                portal_totals[key] += record[key]
+            _write_prometheus()
+
+
+def _write_prometheus():
+    lines = [
+        "# HELP resume_stage_seconds_total Time spent per pipeline stage.",
+        "# TYPE resume_stage_seconds_total counter",
+    ]
+    lines += [f'resume_stage_seconds_total{{portal="{portal}",stage="{stage}"}} {seconds:.6f}'
+              for (portal, stage), (seconds, _) in sorted(_stage_totals.items())]
+    lines += ["# HELP resume_stage_count_total Times each pipeline stage ran.", "# TYPE resume_stage_count_total counter"]
+    lines += [f'resume_stage_count_total{{portal="{portal}",stage="{stage}"}} {count}'
+              for (portal, stage), (_, count) in sorted(_stage_totals.items())]
+    for key, help_text in (("runs", "Recorded runs."), ("wall_seconds", "Wall time of recorded runs."),
+                           ("api_calls", "Model calls made."), ("cache_hits", "Model calls served from the cache."),
+                           ("prompt_tokens", "Prompt tokens reported by the model."),
+                           ("output_tokens", "Output tokens reported by the model.")):
+        lines += [f"# HELP resume_{key}_total {help_text}", f"# TYPE resume_{key}_total counter"]
+        lines += [f'resume_{key}_total{{portal="{portal}"}} {totals[key]}' for portal, totals in sorted(_portal_totals.items())]
+    directory = os.path.dirname(METRICS_PROMETHEUS_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Replaced atomically so the collector never reads a partial file
+    temporary = f"{METRICS_PROMETHEUS_PATH}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temporary, METRICS_PROMETHEUS_PATH)
@@ -3,22 +3,35 @@
 
 
 import streamlit as st
-import google.generativeai as genai
-import os
-import PyPDF2 as pdf
 import pandas as pd
-import json
-import re
+import time
 from dotenv import load_dotenv
+from exports import EXPORT_FORMATS, export_results, new_job_id
+from field_extractor import extract_fields
+from llm_backend import LLMBackendError, get_backend
+from llm_cache import get_llm_cache
+from metrics import diagnostics_rows, diagnostics_summary, finish_run, span, start_run
+from pdf_text import extract_many, get_pdf_text_cache
+from rate_limit import get_rate_controller
+from result_filters import FilterSyntaxError, ResultFilter, compile_query, searchable
+from resume_corpus import get_resume_corpus
+from screening import DEFAULT_BATCH_SIZE, DEFAULT_MAX_WORKERS, ScreeningJob
+
+TABLE_REFRESH_SECONDS = 0.5
+QUERY_HELP = (
+    "Filter the scored resumes, e.g. `ATS >= 60 and CGPA >= 8 and certifications contains \"AWS\" "
+    "and college in [\"IIT\", \"NIT\"] sort by ATS desc top 20`. Fields: ATS, CGPA, college, "
+    "certifications, email, local score, name. Combine conditions with and, or, not and parentheses."
+)
 
 def industry_portal():
-    # Load environment variables and configure the Generative AI API
+    # Load environment variables; the model client is created once per process and reused across reruns
     load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        st.error("GOOGLE_API_KEY not set in the environment variables!")
+    try:
+        backend = get_backend()
+    except LLMBackendError as e:
+        st.error(str(e))
         return
-    genai.configure(api_key=api_key)
     
     st.title("Leveraging Generative AI for Candidate Screening and Automated Resume Optimization")
     st.write(
@@ -27,168 +40,197 @@ def industry_portal():
     
     # Input fields
     jd = st.text_area("Job Description", placeholder="Paste the job description here...")
-    uploaded_files = st.file_uploader("Upload Resumes (PDFs)", type="pdf", accept_multiple_files=True)
-    query = st.text_area("Enter your Query", 
-                         placeholder="Screen the resumes with ATS score more than 40%, who have graduated from top institutions like Meghnad Saha Institute of Tecchnology")
     
-    # Extract criteria from the query (threshold and required college)
-    threshold_val = None
-    required_college = None
+    # Resumes can come from this upload or from the corpus of every resume uploaded before
+    corpus = get_resume_corpus()
+    source = st.radio("Resumes to Screen", ["Uploaded Resumes", "Stored Resume Corpus"], horizontal=True)
+    if source == "Uploaded Resumes":
+        uploaded_files = st.file_uploader("Upload Resumes (PDFs)", type="pdf", accept_multiple_files=True)
+        save_to_corpus = st.checkbox("Save Uploaded Resumes to the Corpus", value=True,
+                                     help="Stored resumes can be screened against later job descriptions without uploading them again")
+    else:
+        uploaded_files = []
+        corpus_top_k = st.number_input(f"Resumes to Shortlist from the Corpus ({len(corpus)} stored)", min_value=1,
+                                       value=100, help="The stored resumes closest to the job description are screened")
+    query = st.text_area("Enter your Query", 
+                         placeholder="ATS >= 40 and college contains \"Meghnad Saha Institute of Technology\" sort by ATS desc",
+                         help=QUERY_HELP)
+    # The query only filters and sorts scored rows, so it is compiled once per rerun
     try:
-        threshold_match = re.search(r"ATS\s*score\s*more\s*than\s*(\d+)", query, re.IGNORECASE)
-        if threshold_match:
-            threshold_val = float(threshold_match.group(1))
-    except Exception as e:
-        st.write("Could not extract ATS score threshold:", e)
+        query_filter = compile_query(query)
+    except FilterSyntaxError as e:
+        st.warning(f"Could not understand the query ({e}); showing all scored resumes.")
+        query_filter = ResultFilter()
+    max_workers = st.number_input("Concurrent Requests", min_value=1, max_value=64, value=DEFAULT_MAX_WORKERS,
+                                  help="Number of resumes extracted and scored at the same time")
     
-    try:
-        college_match = re.search(r"graduated\s*from\s*top\s*institutions\s*like\s*([^,]+)", query, re.IGNORECASE)
-        if college_match:
-            required_college = college_match.group(1).strip()
-    except Exception as e:
-        st.write("Could not extract required college:", e)
+    # Local pre-ranking: limit which resumes get a full Gemini evaluation
+    col1, col2 = st.columns(2)
+    with col1:
+        top_k = st.number_input("Send Top-K Resumes to Gemini (0 = all)", min_value=0, value=0,
+                                help="Only the best locally ranked resumes are scored by Gemini")
+    with col2:
+        min_local_score = st.slider("Minimum Local Match Score", min_value=0, max_value=100, value=0,
+                                    help="BM25 keyword match against the job description, relative to the best resume")
     
-    if st.button("Process Resumes"):
-        if not jd or not uploaded_files or not query:
-            st.warning("Please provide a job description, upload at least one resume, and enter a query.")
-            return
-        
-        filtered_results = []
-        
-        @st.cache_data(show_spinner=False)
-        def extract_pdf_text(pdf_file):
-            try:
-                reader = pdf.PdfReader(pdf_file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-                return text
-            except Exception as e:
-                st.error(f"Error reading {pdf_file.name}: {e}")
-                return ""
-        
-        @st.cache_data(show_spinner=False)
-        def get_gemini_response(input_text, pdf_content, prompt):
-            model = genai.GenerativeModel('gemini-2.0-flash')  # Update model name if needed
-            response = model.generate_content([input_text, pdf_content, prompt])
-            return response.text
-        
-        def clean_json_response(response_text):
-            cleaned = response_text.strip()
-            # Remove markdown code fences if present (e.g., ```json ... ``` )
-            if cleaned.startswith("```"):
-                lines = cleaned.splitlines()
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                cleaned = "\n".join(lines)
-            return cleaned
-        
-        # Process each uploaded resume
-        for pdf_file in uploaded_files:
-            resume_text = extract_pdf_text(pdf_file)
-            if not resume_text:
-                continue
-            
-            # New prompt: instruct the model to return all required details.
-            prompt = f"""
-You are an expert recruiter. Evaluate the resume based solely on the following query:
-"{query}"
-
-Ignore all other details.
-
-Given the job description:
-{jd}
-
-And the resume content:
-{resume_text}
-
-Based on the above, please:
-- Calculate the ATS match score as a numeric percentage (0 to 100).
-- Determine if the resume meets the criteria (return "Yes" if it does, otherwise "No").
-- Identify the candidate's College.
-- Extract the candidate's CGPA.
-- List any Certifications.
-- Provide the candidate's Email.
-
-Return your answer strictly in JSON format with only these keys:
-- "Match": "Yes" or "No"
-- "ATS Score": (numeric percentage or "N/A")
-- "College": (the name of the college or "N/A")
-- "CGPA": (numeric value or "N/A")
-- "Certifications": (a list of certifications or "N/A")
-- "Candidate Email": (the candidate's email or "N/A")
-
-Ensure the JSON is valid.
-            """
-            try:
-                response_text = get_gemini_response(jd, resume_text, prompt)
-            except Exception as e:
-                st.error(f"Error processing {pdf_file.name}: {e}")
-                continue
-            
-            st.write(f"Raw response for {pdf_file.name}:", response_text)
-            
-            cleaned_response = clean_json_response(response_text)
-            try:
-                parsed_response = json.loads(cleaned_response)
-            except Exception as e:
-                st.error(f"Failed to parse JSON for {pdf_file.name}: {e}")
-                parsed_response = {
-                    "Match": "Parsing Error",
-                    "ATS Score": "N/A",
-                    "College": "N/A",
-                    "CGPA": "N/A",
-                    "Certifications": "N/A",
-                    "Candidate Email": "N/A"
-                }
-            
-            # If ATS Score is missing or "N/A", attempt to extract a percentage from the response text
-            ats = str(parsed_response.get("ATS Score", "")).strip()
-            if ats.upper() == "N/A" or ats == "":
-                match_percentage = re.search(r"(\d+(\.\d+)?)\s*%", cleaned_response)
-                if match_percentage:
-                    parsed_response["ATS Score"] = match_percentage.group(1)
-            
-            # If the model returns "No", override if our criteria are met
-            if parsed_response.get("Match", "").strip().lower() != "yes":
-                try:
-                    ats_val = float(parsed_response.get("ATS Score", 0))
-                except:
-                    ats_val = 0
-                college_val = parsed_response.get("College", "").strip().lower()
-                if threshold_val is not None and ats_val >= threshold_val:
-                    if required_college is None or required_college.lower() in college_val:
-                        parsed_response["Match"] = "Yes"
-            
-            # Only include resumes that meet the criteria ("Match": "Yes")
-            if parsed_response.get("Match", "").strip().lower() == "yes":
-                result = {
-                    "File Name": pdf_file.name,
-                    "ATS Score": parsed_response.get("ATS Score", "N/A"),
-                    "College": parsed_response.get("College", "N/A"),
-                    "CGPA": parsed_response.get("CGPA", "N/A"),
-                    "Certifications": parsed_response.get("Certifications", "N/A"),
-                    "Candidate Email": parsed_response.get("Candidate Email", "N/A")
-                }
-                filtered_results.append(result)
-                st.write(f"Processed {pdf_file.name} (Criteria Met):", result)
+    # Batch mode: pack several resumes into one Gemini request
+    col1, col2 = st.columns(2)
+    with col1:
+        batch_mode = st.checkbox("Score Several Resumes per Request", value=False,
+                                 help="Fewer, larger requests; falls back to one request per resume if a batch answer is incomplete")
+    with col2:
+        batch_size = st.number_input("Max Resumes per Request", min_value=2, max_value=20, value=DEFAULT_BATCH_SIZE,
+                                     disabled=not batch_mode)
+    export_format = st.selectbox("Export Format", list(EXPORT_FORMATS))
+    show_raw = st.checkbox("Show Raw Model Responses", value=False, help="Adds a collapsed debug view of every Gemini answer")
+    show_diagnostics = st.checkbox("Show Diagnostics", value=False,
+                                   help="Time spent in each stage of the last run, and the tokens it used")
+    
+    table = None
+    run = None
+    try:
+        if st.button("Process Resumes"):
+            # An empty query shows every scored resume
+            if not jd or (source == "Uploaded Resumes" and not uploaded_files):
+                st.warning("Please provide a job description and upload at least one resume.")
+                return
+
+            scored_results = []
+            matched = 0
+            failed = []
+            job_id = new_job_id()
+            # Stage timings and token usage of this run, recorded until the export below
+            run = start_run("industry", job_id)
+            job = ScreeningJob(jd, max_workers=max_workers, top_k=top_k, min_local_score=min_local_score,
+                               batch_size=batch_size if batch_mode else None)
+
+            resumes = []
+            if source == "Uploaded Resumes":
+                # Extract text from every upload on the process pool, with per-file and per-page timeouts
+                with st.spinner(f"Extracting text from {len(uploaded_files)} resumes..."):
+                    extractions = extract_many([pdf_file.getvalue() for pdf_file in uploaded_files])
+                for pdf_file, (sha256, resume_text, error) in zip(uploaded_files, extractions):
+                    if error is not None:
+                        st.error(f"Error reading {pdf_file.name}: {error}")
+                    elif resume_text:
+                        # Fields are extracted once, for screening and for the corpus
+                        fields = extract_fields(resume_text)
+                        resumes.append((pdf_file.name, resume_text, fields))
+                        if save_to_corpus:
+                            corpus.add(sha256, pdf_file.name, resume_text, fields)
             else:
-                st.write(f"Processed {pdf_file.name} did not meet the criteria.")
-        
-        st.write("Final Filtered Results:")
-        st.write(filtered_results)
-        
-        # Export filtered results to Excel if available
-        if filtered_results:
-            df = pd.DataFrame(filtered_results)
-            output_file = "Industry_Results.xlsx"
-            df.to_excel(output_file, index=False)
-            with open(output_file, "rb") as file:
-                st.download_button("Download Results as Excel", data=file.read(), file_name=output_file)
+                # Rank every stored resume against the JD; only the shortlist is screened
+                shortlisted = corpus.search(jd, corpus_top_k)
+                resumes = [(name, resume_text, fields) for _, name, resume_text, fields in shortlisted]
+                st.info(f"Shortlisted {len(resumes)} of {len(corpus)} stored resumes.")
+
+            # Local field extraction and pre-ranking before any Gemini call
+            candidates, skipped = job.prepare(resumes)
+            if skipped:
+                st.info(f"Local pre-ranking sent {len(candidates)} of {len(candidates) + len(skipped)} resumes to Gemini.")
+
+            # Results are shown in one ranked table that is refreshed while the batch runs
+            st.subheader("Filtered Results")
+            progress = st.progress(0.0, text=f"Screening {len(candidates)} resumes...")
+            table = st.empty()
+            raw_view = st.expander("Raw model responses", expanded=False) if show_raw else None
+            last_refresh = 0.0
+
+            for done, outcome in enumerate(job.iter_scored(candidates), start=1):
+                candidate = outcome.item
+                progress.progress(done / len(candidates),
+                                  text=f"Screened {done} of {len(candidates)} resumes, {matched} matched")
+                if not outcome.ok:
+                    st.error(f"Error processing {candidate.name}: {outcome.error}")
+                    failed.append(candidate.name)
+                    continue
+                response_text = outcome.value
+
+                if raw_view is not None:
+                    raw_view.write(f"Raw response for {candidate.name}:")
+                    raw_view.code(response_text)
+
+                result, parse_error = job.evaluate(candidate, response_text)
+                if parse_error is not None:
+                    st.error(f"Failed to parse JSON for {candidate.name}: {parse_error}")
+                scored_results.append(result)
+
+                # Redraw the ranked table at most a few times per second, filtering
+                # all rows scored so far in one pass
+                if time.monotonic() - last_refresh >= TABLE_REFRESH_SECONDS:
+                    with span("filter"):
+                        shown = query_filter.apply(pd.DataFrame(scored_results))
+                    matched = len(shown)
+                    table.dataframe(shown, use_container_width=True, hide_index=True)
+                    last_refresh = time.monotonic()
+
+            progress.progress(1.0, text=f"Screened {len(candidates)} resumes")
+
+            if failed:
+                st.warning(f"{len(failed)} resumes could not be scored even after retries and are not in the table: "
+                           f"{', '.join(failed)}")
+
+            prompts_sent = job.prompts_sent
+            for prompt in prompts_sent:
+                if prompt.truncated:
+                    st.warning(f"Truncated to fit the prompt size budget: {', '.join(prompt.truncated)}")
+            st.caption(f"Gemini input: {len(prompts_sent)} requests, {sum(p.chars for p in prompts_sent)} characters "
+                       f"(~{sum(p.estimated_tokens for p in prompts_sent)} tokens)")
+            cache_stats = get_pdf_text_cache().stats()
+            st.caption(f"PDF text cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            corpus_stats = corpus.stats()
+            st.caption(f"Resume corpus: {corpus_stats['entries']} stored resumes "
+                       f"({corpus_stats['vector_bytes'] / 1e6:.1f} MB of term vectors)")
+            llm_stats = get_llm_cache().stats()
+            st.caption(f"LLM response cache: {llm_stats['hits']} hits, {llm_stats['misses']} misses "
+                       f"({llm_stats['hit_rate']:.0%} hit rate)")
+            rate_stats = get_rate_controller(backend.name).stats()
+            st.caption(f"API calls: {rate_stats['calls']}, {rate_stats['throttled']} rate limited, "
+                       f"{rate_stats['retries']} retries ({rate_stats['backoff_seconds']:.1f}s backoff), "
+                       f"{rate_stats['failures']} failed; current in-flight limit {rate_stats['limit']}")
+
+            # Scores do not depend on the query, so they are kept for this session
+            # together with the typed view that the query filters run on
+            scored = pd.DataFrame(scored_results)
+            st.session_state.industry_screening = {"jd": jd, "job_id": job_id, "results": scored,
+                                                   "view": searchable(scored)}
+
+        # The query is applied locally to the stored scores, so editing it re-filters
+        # the table instantly without another Gemini call
+        screening = st.session_state.get("industry_screening")
+        if screening is None or screening["jd"] != jd:
+            return
+        if table is None:
+            st.subheader("Filtered Results")
+            table = st.empty()
+        with span("filter"):
+            df = query_filter.apply(screening["results"], screening["view"])
+
+        # Export filtered results in memory, named after this screening job. The
+        # file is kept for the session and only rebuilt when the job, query or
+        # format changes, so other widget changes do not pay for it again.
+        if not df.empty:
+            table.dataframe(df, use_container_width=True, hide_index=True)
+            export_key = (screening["job_id"], query_filter.source, export_format)
+            export = st.session_state.get("industry_export")
+            if export is None or export[0] != export_key:
+                export = (export_key, export_results(df, export_format, screening["job_id"]))
+                st.session_state.industry_export = export
+            data, file_name, mime = export[1]
+            st.download_button(f"Download Results as {export_format}", data=data, file_name=file_name, mime=mime)
         else:
+            table.empty()
             st.info("No resumes matched the query criteria.")
+    finally:
+        # Recorded even when the run fails part way, e.g. on an API error
+        if run is not None:
+            st.session_state.industry_diagnostics = finish_run(run)
+    
+    diagnostics = st.session_state.get("industry_diagnostics")
+    if show_diagnostics and diagnostics is not None:
+        with st.expander("Diagnostics", expanded=True):
+            st.dataframe(diagnostics_rows(diagnostics), use_container_width=True, hide_index=True)
+            st.caption(diagnostics_summary(diagnostics))
 
 if __name__ == "__main__":
     industry_portal()
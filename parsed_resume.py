@@ -0,0 +1,25 @@
+# The student's resume, parsed once per session.
+# The student portal keeps one ParsedResume in the Streamlit session for the
+# current upload, so switching between features reuses the extracted text and
+# sections instead of uploading and parsing the PDF again.
+
+import hashlib
+
+from field_extractor import split_sections
+
+
+class ParsedResume:
+    __slots__ = ("names", "fingerprint", "text", "sections")
+
+    def __init__(self, names, fingerprint, text, sections):
+        self.names = names
+        self.fingerprint = fingerprint
+        self.text = text
+        self.sections = sections
+
+    @classmethod
+    def from_text(cls, names, digests, text):
+        # digests are the SHA-256 of each uploaded PDF; several files share
+        # one fingerprint derived from all of them
+        fingerprint = digests[0] if len(digests) == 1 else hashlib.sha256("".join(digests).encode("ascii")).hexdigest()
+        return cls(tuple(names), fingerprint, text, split_sections(text))
@@ -0,0 +1,370 @@
+# PDF text extraction shared by the student and industry portals.
+# Extracted text is stored in an on-disk cache keyed by the SHA-256 of the
+# PDF bytes, so a resume that has been parsed once is never parsed again,
+# across sessions, portals and server restarts. Only the first
+# PDF_MAX_PAGES pages and PDF_MAX_CHARS characters of a resume are read, so
+# time and memory follow that budget rather than the size of the upload.
+
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2 as pdf
+
+from metrics import timed
+
+PDF_TEXT_CACHE_DIR = os.getenv("PDF_TEXT_CACHE_DIR", os.path.join(".cache", "pdf_text"))
+PDF_TEXT_CACHE_MAX_MB = float(os.getenv("PDF_TEXT_CACHE_MAX_MB", "256"))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_FILE_TIMEOUT_SECONDS = float(os.getenv("PDF_FILE_TIMEOUT_SECONDS", "60"))
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PDF_PAGE_TIMEOUT_SECONDS", "10"))
+# 0 means no limit
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+# Extra time the parent process waits for a worker before treating it as stuck
+POOL_GRACE_SECONDS = 5
+
+
+def fingerprint(source):
+    # SHA-256 of PDF bytes or of a binary file object (e.g. a Streamlit upload),
+    # which is read in chunks rather than copied whole
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(1024 * 1024), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    with open(path, "rb") as f:
+        return fingerprint(f)
+
+
+def _cache_key(digest, max_pages, max_chars):
+    # Text extracted under different limits is cached separately
+    return f"{digest}-{max_pages}p-{max_chars}c"
+
+
+def _as_stream(source):
+    # PdfReader reads from any seekable binary stream, so file objects are
+    # parsed in place instead of being copied into a new buffer
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+class ExtractionTimeout(BaseException):
+    # Raised by the alarm in the middle of PyPDF2 code, which catches
+    # Exception in places and would carry on with a broken parser state; like
+    # KeyboardInterrupt it gets past those handlers. It does not leave this
+    # module: callers see a TimeoutError.
+    pass
+
+
+@contextlib.contextmanager
+def _time_limit(seconds):
+    # Interrupt the enclosed code after the given number of seconds. This uses
+    # SIGALRM, which only works in the main thread of a process on Unix (as in
+    # the extraction pool's workers); elsewhere the limits are only checked
+    # between pages.
+    if seconds is None or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise ExtractionTimeout(f"timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def iter_pages(source, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, on_page_error=None, page_timeout=None,
+               file_timeout=None):
+    # Yield the text of each page in turn, stopping after max_pages pages or
+    # once max_chars characters have been yielded (the last page is cut to
+    # fit). Pages past the budget are never parsed. Errors on a single page
+    # (including a page running over page_timeout) are passed to on_page_error
+    # (if given) and the page is skipped; errors on the whole document,
+    # including running over file_timeout, are raised.
+    deadline = time.monotonic() + file_timeout if file_timeout else None
+    try:
+        with _time_limit(file_timeout):
+            reader = pdf.PdfReader(_as_stream(source))
+            page_count = len(reader.pages)
+    except ExtractionTimeout:
+        raise TimeoutError(f"Timed out after {file_timeout:g}s opening the PDF") from None
+    if page_count == 0:
+        raise ValueError("PDF has no readable pages")
+    if max_pages:
+        page_count = min(page_count, max_pages)
+    chars_left = max_chars or None
+    for number in range(1, page_count + 1):
+        page = reader.pages[number - 1]
+        limit = page_timeout
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"Timed out after {file_timeout:g}s at page {number} of {page_count}")
+            limit = left if limit is None else min(limit, left)
+        try:
+            with _time_limit(limit):
+                page_text = page.extract_text()
+        except ExtractionTimeout:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out after {file_timeout:g}s at page {number} of {page_count}") from None
+            if on_page_error is not None:
+                on_page_error(TimeoutError(f"Page {number} timed out after {page_timeout:g}s"))
+            continue
+        except Exception as page_error:
+            if on_page_error is not None:
+                on_page_error(page_error)
+            continue
+        if not page_text:
+            continue
+        if chars_left is not None:
+            page_text = page_text[:chars_left]
+            chars_left -= len(page_text)
+        yield page_text
+        if chars_left is not None and chars_left <= 0:
+            return
+
+
+def extract_text(source, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, on_page_error=None, page_timeout=None,
+                 file_timeout=None):
+    # Text of the PDF's pages within the page and character budget, one line break after each page
+    return "".join(
+        page_text + "\n"
+        for page_text in iter_pages(source, max_pages=max_pages, max_chars=max_chars, on_page_error=on_page_error,
+                                    page_timeout=page_timeout, file_timeout=file_timeout)
+    )
+
+
+class PdfTextCache:
+    # Content-addressed store of extracted text with size-bounded LRU eviction.
+    # Each entry is a UTF-8 file named after the PDF's SHA-256 and the
+    # extraction limits; the file's mtime is refreshed on every hit and used
+    # as the recency order.
+
+    def __init__(self, directory=PDF_TEXT_CACHE_DIR, max_bytes=int(PDF_TEXT_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def _entries(self):
+        # (path, size, mtime) for every cached entry
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, info.st_size, info.st_mtime
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used entries until the cache is at 90% of its budget
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def get_or_extract(self, source, on_page_error=None, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+        key = _cache_key(fingerprint(source), max_pages, max_chars)
+        text = self.get(key)
+        if text is None:
+            text = extract_text(source, max_pages=max_pages, max_chars=max_chars, on_page_error=on_page_error)
+            self.put(key, text)
+        return text
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size_bytes": self._size,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_text_cache():
+    # Process-wide cache instance shared by both portals
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfTextCache()
+        return _cache
+
+
+@timed("pdf_parse")
+def cached_extract_text(source, on_page_error=None):
+    return get_pdf_text_cache().get_or_extract(source, on_page_error=on_page_error)
+
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(max_workers):
+    # Process-wide extraction pool, created on first bulk extraction. Workers
+    # are spawned rather than forked, since the Streamlit server is threaded;
+    # a spawned worker re-imports the app's main script, which is why the
+    # entry points keep their work under `if __name__ == "__main__"`.
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = max_workers
+        return _pool
+
+
+def _discard_pool():
+    # A worker is stuck in code the alarm could not interrupt, or has died;
+    # kill the pool's processes so the next bulk extraction starts fresh
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            return
+        processes = getattr(_pool, "_processes", None) or {}
+        for process in list(processes.values()):
+            process.terminate()
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_in_worker(source, max_pages, max_chars, page_timeout, file_timeout):
+    # (text, number of pages skipped because of an error or timeout)
+    page_errors = []
+    try:
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                text = extract_text(f, max_pages=max_pages, max_chars=max_chars, on_page_error=page_errors.append,
+                                    page_timeout=page_timeout, file_timeout=file_timeout)
+        else:
+            text = extract_text(source, max_pages=max_pages, max_chars=max_chars, on_page_error=page_errors.append,
+                                page_timeout=page_timeout, file_timeout=file_timeout)
+        return text, len(page_errors)
+    except ExtractionTimeout:
+        # An alarm that fired just outside the handled parsing calls
+        raise TimeoutError("PDF extraction timed out") from None
+
+
+@timed("pdf_parse")
+def extract_many(sources, max_workers=PDF_EXTRACT_WORKERS, page_timeout=PDF_PAGE_TIMEOUT_SECONDS,
+                 file_timeout=PDF_FILE_TIMEOUT_SECONDS, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    # Extract text from many PDFs (bytes or file paths) on a process pool, so
+    # CPU-bound parsing uses every core and cannot block the calling thread.
+    # Cached files are served without touching the pool. Returns a list of
+    # (sha256, text, error) in input order; a failure or timeout in one file
+    # only affects that file's entry.
+    cache = get_pdf_text_cache()
+    results = [None] * len(sources)
+    pending = []
+    for index, source in enumerate(sources):
+        try:
+            digest = file_fingerprint(source) if isinstance(source, str) else fingerprint(source)
+        except OSError as e:
+            results[index] = (None, None, e)
+            continue
+        text = cache.get(_cache_key(digest, max_pages, max_chars))
+        if text is not None:
+            results[index] = (digest, text, None)
+        else:
+            pending.append((index, digest, source))
+    if not pending:
+        return results
+
+    pool = _get_pool(max(1, max_workers))
+    workers = max(1, min(max_workers, len(pending)))
+    futures = [(index, digest, pool.submit(_extract_in_worker, source, max_pages, max_chars, page_timeout, file_timeout))
+               for index, digest, source in pending]
+    # Workers enforce the timeouts themselves; the parent only needs a backstop
+    # for a worker that is stuck outside of Python code
+    deadline = None
+    if file_timeout:
+        rounds = -(-len(pending) // workers)
+        deadline = time.monotonic() + rounds * file_timeout + POOL_GRACE_SECONDS
+    stuck = False
+    for index, digest, future in futures:
+        try:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            text, skipped_pages = future.result(timeout=timeout)
+        except FuturesTimeout:
+            stuck = True
+            results[index] = (digest, None, TimeoutError(f"Timed out after {file_timeout:g}s"))
+        except Exception as e:
+            stuck = stuck or isinstance(e, BrokenProcessPool)
+            results[index] = (digest, None, e)
+        else:
+            # Text missing pages that timed out or failed is not cached, so the next run tries again
+            if not skipped_pages:
+                cache.put(_cache_key(digest, max_pages, max_chars), text)
+            results[index] = (digest, text, None)
+    if stuck:
+        _discard_pool()
+    return results
@@ -0,0 +1,280 @@
+# Portfolio website for the Project Portfolio Builder.
+# The page template is parsed once at import into literal chunks and field
+# names, so rendering a portfolio is a single join in memory; the page is
+# offered for download straight from the rendered string.
+
+import string
+
+PORTFOLIO_TEMPLATE = '''
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{project_name} - Project Portfolio</title>
+    <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+            font-family: 'Poppins', sans-serif;
+        }}
+
+        body {{
+            background: linear-gradient(135deg, #1a1a2e, #16213e);
+            color: #fff;
+            line-height: 1.6;
+        }}
+
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 2rem;
+        }}
+
+        header {{
+            text-align: center;
+            padding: 4rem 0;
+            animation: fadeIn 1s ease-in;
+        }}
+
+        h1 {{
+            font-size: 3rem;
+            margin-bottom: 1rem;
+            background: linear-gradient(45deg, #00f2fe, #4facfe);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+        }}
+
+        .project-info {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 2rem;
+            margin: 3rem 0;
+            animation: slideUp 1s ease-in;
+        }}
+
+        .info-card {{
+            background: rgba(255, 255, 255, 0.1);
+            padding: 1.5rem;
+            border-radius: 10px;
+            backdrop-filter: blur(10px);
+            transition: transform 0.3s ease;
+        }}
+
+        .info-card:hover {{
+            transform: translateY(-5px);
+        }}
+
+        .project-details {{
+            background: rgba(255, 255, 255, 0.05);
+            padding: 2rem;
+            border-radius: 15px;
+            margin: 2rem 0;
+            animation: slideUp 1.2s ease-in;
+        }}
+
+        .tech-stack {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 1rem;
+            margin: 1rem 0;
+        }}
+
+        .tech-item {{
+            background: rgba(0, 242, 254, 0.2);
+            padding: 0.5rem 1rem;
+            border-radius: 20px;
+            font-size: 0.9rem;
+        }}
+
+        .project-overview {{
+            margin: 2rem 0;
+        }}
+
+        .project-overview p {{
+            margin-bottom: 1.5rem;
+            text-align: justify;
+            padding-left: 0;
+        }}
+
+        .best-features {{
+            margin: 2rem 0;
+        }}
+
+        .best-features ul {{
+            list-style-type: none;
+            padding-left: 0;
+        }}
+
+        .best-features li {{
+            margin-bottom: 1rem;
+            padding-left: 0;
+            position: relative;
+        }}
+
+        .best-features li:before {{
+            content: "";
+            display: none;
+        }}
+
+        @keyframes fadeIn {{
+            from {{ opacity: 0; }}
+            to {{ opacity: 1; }}
+        }}
+
+        @keyframes slideUp {{
+            from {{ transform: translateY(50px); opacity: 0; }}
+            to {{ transform: translateY(0); opacity: 1; }}
+        }}
+
+        .highlight {{
+            color: #00f2fe;
+            font-weight: 500;
+        }}
+
+        footer {{
+            text-align: center;
+            padding: 2rem 0;
+            margin-top: 3rem;
+            border-top: 1px solid rgba(255, 255, 255, 0.1);
+        }}
+
+        .project-link {{
+            margin-top: 2rem;
+            padding: 1rem;
+            background: rgba(255, 255, 255, 0.05);
+            border-radius: 10px;
+        }}
+
+        .project-link a {{
+            display: inline-block;
+            margin-top: 0.5rem;
+            padding: 0.5rem 1rem;
+            background: rgba(0, 242, 254, 0.2);
+            border-radius: 20px;
+            text-decoration: none;
+            transition: all 0.3s ease;
+        }}
+
+        .project-link a:hover {{
+            background: rgba(0, 242, 254, 0.3);
+            transform: translateY(-2px);
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>{project_name}</h1>
+            <p class="highlight">A showcase of innovation and technical excellence</p>
+        </header>
+
+        <div class="project-info">
+            <div class="info-card">
+                <h3>Project Duration</h3>
+                <p>{project_duration}</p>
+            </div>
+            <div class="info-card">
+                <h3>Role</h3>
+                <p>{project_role}</p>
+            </div>
+            <div class="info-card">
+                <h3>Team Size</h3>
+                <p>{project_team}</p>
+            </div>
+        </div>
+
+        <div class="project-details">
+            <h2>Project Overview</h2>
+            <div class="project-overview">
+                {enhanced_text}
+            </div>
+
+            <h2>Best Features</h2>
+            <div class="best-features">
+                {best_features_text}
+            </div>
+
+            <h3>Technologies Used</h3>
+            <div class="tech-stack">
+                {tech_stack_html}
+            </div>
+
+            {project_link_html}
+        </div>
+    </div>
+
+    <footer>
+        <p>© {project_name} Portfolio | Designed with ❤️</p>
+    </footer>
+
+    <script>
+        // Add scroll animations
+        document.addEventListener('DOMContentLoaded', () => {{
+            const observer = new IntersectionObserver((entries) => {{
+                entries.forEach(entry => {{
+                    if (entry.isIntersecting) {{
+                        entry.target.style.opacity = '1';
+                        entry.target.style.transform = 'translateY(0)';
+                    }}
+                }});
+            }}, {{ threshold: 0.1 }});
+
+            document.querySelectorAll('.info-card, .project-details').forEach(el => {{
+                el.style.opacity = '0';
+                el.style.transform = 'translateY(20px)';
+                el.style.transition = 'all 0.6s ease-out';
+                observer.observe(el);
+            }});
+        }});
+    </script>
+</body>
+</html>
+'''
+
+
+def _compile(template):
+    # [(literal text, field name or None)] as parsed by str.format
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+
+_PORTFOLIO_PARTS = _compile(PORTFOLIO_TEMPLATE)
+
+
+def _render(parts, fields):
+    return "".join(literal + (str(fields[field]) if field is not None else "") for literal, field in parts)
+
+
+def render_portfolio(project_name, project_duration, project_role, project_team, project_tech, project_link,
+                     enhanced, best_features):
+    # Prepare the content
+    enhanced_text = enhanced.replace('**', '').replace('\n', '</p><p>')
+    enhanced_text = '<p>' + enhanced_text + '</p>'
+
+    # Remove stars from best features and clean up
+    best_features_text = best_features.replace('**', '')
+    best_features_text = '<ul><li>' + best_features_text.replace('\n', '</li><li>') + '</li></ul>'
+    tech_stack_html = ''.join([f'<span class="tech-item">{tech.strip()}</span>' for tech in project_tech.split(',')])
+
+    # Only create project link HTML if a link is provided
+    project_link_html = ''
+    if project_link and project_link.strip():
+        project_link_html = f'''
+        <div class="project-link">
+            <h3>Project Link</h3>
+            <a href="{project_link}" class="highlight" target="_blank">View Live Project</a>
+        </div>
+        '''
+
+    return _render(_PORTFOLIO_PARTS, {
+        "project_name": project_name,
+        "project_duration": project_duration if project_duration else "Not specified",
+        "project_role": project_role if project_role else "Not specified",
+        "project_team": project_team if project_team else "Not specified",
+        "enhanced_text": enhanced_text,
+        "best_features_text": best_features_text,
+        "tech_stack_html": tech_stack_html,
+        "project_link_html": project_link_html,
+    })
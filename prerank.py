@@ -0,0 +1,75 @@
+# Local first-stage ranking of resumes against a job description.
+# Scores every resume with BM25 over the job description's terms using NumPy,
+# so that only the most promising resumes are sent to Gemini for the
+# authoritative ATS score.
+
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+for from had has have having he her here his how i if in into is it its just may me more most must
+my no nor not of on or other our out over own per she should so some such than that the their them
+then there these they this those through to too under up very was we were what when where which
+while who whom why will with within would you your
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def bm25_scores(query_text, documents, k1=1.5, b=0.75):
+    # BM25 score of every document for the terms of query_text.
+    # Only the query's vocabulary is materialized, so the term matrix is
+    # (documents x distinct query terms) regardless of resume length.
+    query_terms = sorted(set(tokenize(query_text)))
+    scores = np.zeros(len(documents), dtype=np.float64)
+    if not query_terms or not documents:
+        return scores
+    term_index = {term: i for i, term in enumerate(query_terms)}
+
+    doc_ids = []
+    term_ids = []
+    doc_lengths = np.zeros(len(documents), dtype=np.float64)
+    for doc_id, text in enumerate(documents):
+        tokens = tokenize(text)
+        doc_lengths[doc_id] = len(tokens)
+        for token in tokens:
+            term_id = term_index.get(token)
+            if term_id is not None:
+                doc_ids.append(doc_id)
+                term_ids.append(term_id)
+
+    n_docs, n_terms = len(documents), len(query_terms)
+    flat = np.asarray(doc_ids, dtype=np.int64) * n_terms + np.asarray(term_ids, dtype=np.int64)
+    tf = np.bincount(flat, minlength=n_docs * n_terms).reshape(n_docs, n_terms).astype(np.float64)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    avg_length = doc_lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * doc_lengths / avg_length)
+    weights = tf * (k1 + 1) / (tf + norm[:, None])
+    return weights @ idf
+
+
+def local_scores(jd, documents):
+    # BM25 scores rescaled to 0-100 relative to the best resume in the batch
+    scores = bm25_scores(jd, documents)
+    best = scores.max() if len(scores) else 0.0
+    if best <= 0:
+        return np.zeros_like(scores)
+    return np.round(scores / best * 100, 1)
+
+
+def shortlist(scores, top_k=None, min_score=None):
+    # Indices of the resumes to send to the LLM, best local score first
+    order = np.argsort(-scores, kind="stable")
+    if min_score is not None:
+        order = order[scores[order] >= min_score]
+    if top_k:
+        order = order[:top_k]
+    return order.tolist()
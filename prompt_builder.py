@@ -0,0 +1,73 @@
+# Prompt assembly shared by the student and industry portals.
+# A request is built exactly once from named sections, so the job description
+# and resume are sent a single time per call. Each built prompt records its
+# size, and a configurable token budget is enforced by trimming the sections
+# marked as truncatable (typically the resume).
+
+import math
+import os
+
+from metrics import timed
+
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "32000"))
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[...truncated...]"
+
+
+class PromptBudgetError(ValueError):
+    pass
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class PromptSection:
+    def __init__(self, name, text, heading=None, truncatable=False):
+        self.name = name
+        self.text = text.strip() if text else ""
+        self.heading = heading
+        self.truncatable = truncatable
+
+    def render(self):
+        if self.heading:
+            return f"{self.heading}:\n{self.text}"
+        return self.text
+
+
+class Prompt:
+    def __init__(self, text, truncated):
+        self.text = text
+        self.chars = len(text)
+        self.estimated_tokens = estimate_tokens(text)
+        self.truncated = truncated
+
+
+def _join(sections):
+    return "\n\n".join(section.render() for section in sections if section.text)
+
+
+@timed("prompt_build")
+def build_prompt(sections, max_tokens=PROMPT_MAX_TOKENS):
+    # Render sections in order; if the result is over budget, shrink the
+    # truncatable sections (largest first) until it fits
+    text = _join(sections)
+    truncated = []
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    excess = len(text) - max_chars
+    for section in sorted((s for s in sections if s.truncatable), key=lambda s: len(s.text), reverse=True):
+        if excess <= 0:
+            break
+        keep = len(section.text) - excess - len(TRUNCATION_MARKER)
+        if keep <= 0:
+            continue
+        excess -= len(section.text) - keep - len(TRUNCATION_MARKER)
+        section.text = section.text[:keep] + TRUNCATION_MARKER
+        truncated.append(section.name)
+    if truncated:
+        text = _join(sections)
+    if len(text) > max_chars:
+        raise PromptBudgetError(
+            f"Prompt needs ~{estimate_tokens(text)} tokens, over the budget of {max_tokens}"
+        )
+    return Prompt(text, truncated)
@@ -0,0 +1,183 @@
+# Client-side rate control for model calls.
+# Calls that hit a rate limit (HTTP 429) or a transient server or network
+# error are retried with exponential backoff and full jitter. The number of
+# calls in flight adapts AIMD-style: it grows by one after each window of
+# successful calls and is halved when the API reports a rate limit, so bulk
+# runs settle just under the quota instead of dropping resumes. The limit
+# starts at the screening worker count and only grows while callers fill
+# it, so it stays close to the concurrency actually in use and the first
+# halving takes effect.
+
+import os
+import random
+import threading
+import time
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_INITIAL_IN_FLIGHT = int(os.getenv("LLM_INITIAL_IN_FLIGHT", os.getenv("SCREENING_MAX_WORKERS", "8")))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "60"))
+
+TRANSIENT_STATUS_CODES = {408, 500, 502, 503, 504}
+# google.api_core exception names, for errors that carry no HTTP status
+RATE_LIMIT_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+TRANSIENT_ERRORS = {"ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "BadGateway", "GatewayTimeout"}
+
+
+def _status_code(error):
+    code = getattr(error, "code", None)
+    if code is None:
+        code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_rate_limited(error):
+    return _status_code(error) == 429 or type(error).__name__ in RATE_LIMIT_ERRORS
+
+
+def is_transient(error):
+    return (_status_code(error) in TRANSIENT_STATUS_CODES or type(error).__name__ in TRANSIENT_ERRORS
+            or isinstance(error, (ConnectionError, TimeoutError)))
+
+
+class RateController:
+    # Shared by every thread that calls the same backend. Each rate limit
+    # halves the in-flight limit at most once per "epoch": calls that were
+    # already in flight when the limit was cut do not cut it again.
+
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, min_in_flight=1, max_retries=LLM_MAX_RETRIES,
+                 base_delay=LLM_RETRY_BASE_SECONDS, max_delay=LLM_RETRY_MAX_SECONDS,
+                 initial_in_flight=LLM_INITIAL_IN_FLIGHT):
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_in_flight = max(1, min(min_in_flight, self.max_in_flight))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limit = float(max(self.min_in_flight, min(self.max_in_flight, initial_in_flight)))
+        self.in_flight = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.transient_errors = 0
+        self.failures = 0
+        self.backoff_seconds = 0.0
+        self.peak_in_flight = 0
+
+    def _acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            self.calls += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self._epoch
+
+    def _release(self, epoch, error=None):
+        with self._condition:
+            # Whether callers were using the whole limit; raising a limit
+            # nobody reaches would only make the next halving a no-op
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if error is None:
+                if saturated:
+                    # Additive increase: +1 after a full window of successful calls
+                    self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+            elif is_rate_limited(error):
+                self.throttled += 1
+                if epoch == self._epoch:
+                    self.limit = max(self.min_in_flight, self.limit / 2)
+                    self._epoch += 1
+            elif is_transient(error):
+                self.transient_errors += 1
+            self._condition.notify_all()
+
+    def backoff(self, attempt):
+        # Full jitter: a random wait up to the exponential cap for this attempt
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _wait_to_retry(self, error, attempt):
+        # Sleep before the next attempt, or return False when the error is
+        # final (not retryable, or out of retries)
+        if not (is_rate_limited(error) or is_transient(error)):
+            return False
+        if attempt >= self.max_retries:
+            with self._condition:
+                self.failures += 1
+            return False
+        delay = self.backoff(attempt)
+        with self._condition:
+            self.retries += 1
+            self.backoff_seconds += delay
+        time.sleep(delay)
+        return True
+
+    def call(self, func, *args, **kwargs):
+        # Run func under the in-flight limit, retrying rate limits and
+        # transient errors; any other error, or the last retry's, is raised
+        attempt = 0
+        while True:
+            epoch = self._acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._release(epoch, e)
+                if not self._wait_to_retry(e, attempt):
+                    raise
+                attempt += 1
+            else:
+                self._release(epoch)
+                return result
+
+    def stream(self, func, *args, **kwargs):
+        # Like call() for a generator function. The slot is held until the
+        # stream ends or is abandoned; an error is only retried while nothing
+        # has been yielded, since chunks already shown cannot be taken back.
+        attempt = 0
+        while True:
+            epoch = self._acquire()
+            started = False
+            try:
+                for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self._release(epoch, e)
+                if started or not self._wait_to_retry(e, attempt):
+                    raise
+                attempt += 1
+            except BaseException as e:
+                # The consumer stopped reading (GeneratorExit) or was interrupted
+                self._release(epoch, e)
+                raise
+            else:
+                self._release(epoch)
+                return
+
+    def stats(self):
+        with self._condition:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "transient_errors": self.transient_errors,
+                "failures": self.failures,
+                "backoff_seconds": self.backoff_seconds,
+                "limit": int(self.limit),
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_rate_controller(name):
+    # Process-wide controller per backend, since the quota belongs to the API key rather than a session
+    with _controllers_lock:
+        controller = _controllers.get(name)
+        if controller is None:
+            controller = _controllers[name] = RateController()
+        return controller
@@ -0,0 +1,348 @@
+# Filter language for screening results.
+# A recruiter query such as
+#
+#   ATS >= 60 and CGPA >= 8 and certifications contains "AWS"
+#   and college in ["IIT", "NIT"] sort by ATS desc top 20
+#
+# is compiled once into a function that builds a boolean mask over the
+# results DataFrame with vectorized pandas operations. Masks run on a typed
+# view of the results (numbers as floats, text in lower case) that is built
+# once per result set, so tens of thousands of scored candidates can be
+# re-sliced interactively. The older free-text
+# queries ("ATS score more than 40%, who have graduated from top institutions
+# like ...") are still understood and compiled to the same form.
+
+import operator
+import re
+
+import pandas as pd
+
+from exports import export_value
+
+# Field names as written in queries (lower case) -> result column
+FIELD_ALIASES = {
+    "ats": "ATS Score",
+    "ats score": "ATS Score",
+    "score": "ATS Score",
+    "cgpa": "CGPA",
+    "gpa": "CGPA",
+    "college": "College",
+    "institution": "College",
+    "certifications": "Certifications",
+    "certification": "Certifications",
+    "certs": "Certifications",
+    "email": "Candidate Email",
+    "candidate email": "Candidate Email",
+    "local": "Local Score",
+    "local score": "Local Score",
+    "name": "File Name",
+    "file": "File Name",
+    "file name": "File Name",
+}
+NUMERIC_FIELDS = {"ATS Score", "CGPA", "Local Score"}
+DEFAULT_SORT = ("ATS Score", False)
+
+COMPARISONS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<string>\"[^\"]*\"|'[^']*')"
+    r"|(?P<number>-?\d+(?:\.\d+)?)%?"
+    r"|(?P<op>>=|<=|!=|==|=|>|<)"
+    r"|(?P<punct>[\[\](),])"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_.@+#&-]*))"
+)
+
+
+class FilterSyntaxError(ValueError):
+    pass
+
+
+def parse_query_criteria(query):
+    # Extract criteria from the query (threshold and required college)
+    threshold_val = None
+    required_college = None
+    threshold_match = re.search(r"ATS\s*score\s*more\s*than\s*(\d+)", query, re.IGNORECASE)
+    if threshold_match:
+        threshold_val = float(threshold_match.group(1))
+    college_match = re.search(r"graduated\s*from\s*top\s*institutions\s*like\s*([^,]+)", query, re.IGNORECASE)
+    if college_match:
+        required_college = college_match.group(1).strip()
+    return threshold_val, required_college
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            # Report the offending character, not the whitespace before it
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise FilterSyntaxError(f"Unexpected character {text[position]!r} at position {position}; "
+                                    f"put text values in quotes, e.g. \"{text[position:].split()[0]}\"")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = value[1:-1]
+        elif kind == "number":
+            value = float(value)
+        elif kind == "word":
+            value = value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+def searchable(df):
+    # Typed view of a results DataFrame that filters and sorting run on:
+    # numeric fields as floats (NaN when missing or "N/A"), everything else
+    # as stripped lower-case text with lists joined
+    return pd.DataFrame({
+        column: pd.to_numeric(df[column], errors="coerce") if column in NUMERIC_FIELDS
+        else df[column].map(lambda value: str(export_value(value)).strip().lower())
+        for column in df.columns
+    }, index=df.index)
+
+
+def _numbers(view, column):
+    return view[column] if column in NUMERIC_FIELDS else pd.to_numeric(view[column], errors="coerce")
+
+
+def _text(view, column):
+    return view[column].astype(str) if column in NUMERIC_FIELDS else view[column]
+
+
+def _compare(column, op, value):
+    compare = COMPARISONS[op]
+    if isinstance(value, float):
+        return lambda view: compare(_numbers(view, column), value)
+    if op not in ("=", "==", "!="):
+        raise FilterSyntaxError(f"{op} needs a number, got {value!r}")
+    value = value.lower()
+    return lambda view: compare(_text(view, column), value)
+
+
+def _contains(column, value):
+    value = str(value).lower()
+    return lambda view: _text(view, column).str.contains(value, regex=False)
+
+
+def _one_of(column, values):
+    # Numbers must match exactly; text matches when it contains any listed value
+    if all(isinstance(value, float) for value in values):
+        return lambda view: _numbers(view, column).isin(values)
+    pattern = "|".join(re.escape(str(value).lower()) for value in values)
+    return lambda view: _text(view, column).str.contains(pattern, regex=True)
+
+
+class _Parser:
+    # Recursive descent over the token list:
+    #   query      := [condition] (sort by FIELD [asc|desc] | top N | limit N)*
+    #   condition  := term ((or) term)*
+    #   term       := factor ((and | ,) factor)*
+    #   factor     := not factor | ( condition ) | comparison
+    #   comparison := FIELD op value | FIELD [not] contains value | FIELD [not] in [values]
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, kind, value=None):
+        token_kind, token_value = self.take()
+        if token_kind != kind or (value is not None and token_value != value):
+            if token_kind is None:
+                raise FilterSyntaxError(f"Expected {value or kind} at the end of the query")
+            raise FilterSyntaxError(f"Expected {value or kind}, got {token_value!r}")
+        return token_value
+
+    def at_word(self, *words):
+        kind, value = self.peek()
+        return kind == "word" and value in words
+
+    def field(self):
+        # Longest alias made of the next one or two words
+        first = self.peek()
+        second = self.peek(1)
+        if first[0] is None:
+            raise FilterSyntaxError("Expected a field name at the end of the query")
+        if first[0] == "word" and second[0] == "word" and f"{first[1]} {second[1]}" in FIELD_ALIASES:
+            self.position += 2
+            return FIELD_ALIASES[f"{first[1]} {second[1]}"]
+        if first[0] == "word" and first[1] in FIELD_ALIASES:
+            self.position += 1
+            return FIELD_ALIASES[first[1]]
+        raise FilterSyntaxError(f"Unknown field {first[1]!r}; expected one of {', '.join(sorted(FIELD_ALIASES))}")
+
+    def value(self):
+        kind, value = self.take()
+        if kind in ("string", "number"):
+            return value
+        if kind == "word":
+            return value
+        if kind is None:
+            raise FilterSyntaxError("Expected a value at the end of the query")
+        raise FilterSyntaxError(f"Expected a value, got {value!r}")
+
+    def values(self):
+        self.expect("punct", "[")
+        values = [self.value()]
+        while self.peek() == ("punct", ","):
+            self.take()
+            values.append(self.value())
+        self.expect("punct", "]")
+        return values
+
+    def comparison(self):
+        column = self.field()
+        negate = False
+        if self.at_word("not"):
+            self.take()
+            negate = True
+        if self.at_word("contains"):
+            self.take()
+            predicate = _contains(column, self.value())
+        elif self.at_word("in"):
+            self.take()
+            predicate = _one_of(column, self.values())
+        elif not negate and self.peek()[0] == "op":
+            op = self.take()[1]
+            predicate = _compare(column, op, self.value())
+        else:
+            raise FilterSyntaxError(f"Expected a comparison after {column!r}, got {self.peek()[1]!r}")
+        return (lambda view: ~predicate(view)) if negate else predicate
+
+    def factor(self):
+        if self.at_word("not"):
+            self.take()
+            inner = self.factor()
+            return lambda view: ~inner(view)
+        if self.peek() == ("punct", "("):
+            self.take()
+            inner = self.condition()
+            self.expect("punct", ")")
+            return inner
+        return self.comparison()
+
+    def term(self):
+        parts = [self.factor()]
+        while self.at_word("and") or self.peek() == ("punct", ","):
+            self.take()
+            parts.append(self.factor())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda view: _reduce(operator.and_, parts, view)
+
+    def condition(self):
+        parts = [self.term()]
+        while self.at_word("or"):
+            self.take()
+            parts.append(self.term())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda view: _reduce(operator.or_, parts, view)
+
+    def query(self):
+        predicate = None
+        if self.peek()[0] is not None and not self.at_word("sort", "top", "limit"):
+            predicate = self.condition()
+        sort = None
+        top = None
+        while self.peek()[0] is not None:
+            if self.at_word("sort"):
+                self.take()
+                self.expect("word", "by")
+                column = self.field()
+                ascending = False if column in NUMERIC_FIELDS else True
+                if self.at_word("asc", "desc"):
+                    ascending = self.take()[1] == "asc"
+                sort = (column, ascending)
+            elif self.at_word("top", "limit"):
+                self.take()
+                top = self.expect("number")
+                if top < 1 or top != int(top):
+                    raise FilterSyntaxError(f"top needs a positive whole number, got {top:g}")
+                top = int(top)
+            else:
+                raise FilterSyntaxError(f"Unexpected {self.peek()[1]!r}")
+        return predicate, sort, top
+
+
+def _reduce(combine, parts, view):
+    mask = parts[0](view)
+    for part in parts[1:]:
+        mask = combine(mask, part(view))
+    return mask
+
+
+class ResultFilter:
+    # A compiled query: an optional row predicate, a sort order and a row limit
+
+    def __init__(self, predicate=None, sort=None, top=None, source=""):
+        self.predicate = predicate
+        self.sort = sort or DEFAULT_SORT
+        self.top = top
+        self.source = source
+
+    def mask(self, view):
+        # Boolean Series over a searchable() view
+        if self.predicate is None or view.empty:
+            return pd.Series(True, index=view.index)
+        return self.predicate(view)
+
+    def apply(self, df, view=None):
+        # Matching rows of df, sorted, limited to the top N. Pass the
+        # searchable(df) view when filtering the same results repeatedly.
+        if df.empty:
+            return df
+        view = searchable(df) if view is None else view
+        selected = view[self.mask(view)]
+        column, ascending = self.sort
+        if column in selected.columns:
+            selected = selected.sort_values(column, ascending=ascending, na_position="last", kind="stable")
+        if self.top:
+            selected = selected.head(self.top)
+        return df.loc[selected.index]
+
+
+def parse_filter(text):
+    parser = _Parser(_tokenize(text))
+    predicate, sort, top = parser.query()
+    return ResultFilter(predicate, sort, top, source=text)
+
+
+def compile_query(query):
+    # Compile a recruiter query written in the filter language, or in the
+    # older free-text form. Raises FilterSyntaxError when it is neither.
+    query = (query or "").strip()
+    if not query:
+        return ResultFilter()
+    try:
+        return parse_filter(query)
+    except FilterSyntaxError as error:
+        threshold_val, required_college = parse_query_criteria(query)
+        if threshold_val is None and required_college is None:
+            raise error
+    conditions = []
+    if threshold_val is not None:
+        conditions.append(_compare("ATS Score", ">=", threshold_val))
+    if required_college is not None:
+        conditions.append(_contains("College", required_college))
+    return ResultFilter(lambda view: _reduce(operator.and_, conditions, view), source=query)
@@ -0,0 +1,159 @@
+# Persistent corpus of every resume seen by the industry portal or the CLI.
+# Each resume is stored once (keyed by the SHA-256 of its PDF) with its
+# extracted text and locally parsed fields in SQLite, and as a hashed term
+# vector in a memory-mapped float32 matrix. A new job description is matched
+# against the whole corpus with one matrix-vector product, so thousands of
+# stored candidates can be ranked in milliseconds without re-uploading or
+# re-parsing them; only the shortlist goes on to the LLM, with the fields
+# parsed when it was stored.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from field_extractor import Field, extract_fields
+from prerank import tokenize
+
+RESUME_CORPUS_DIR = os.getenv("RESUME_CORPUS_DIR", os.path.join(".cache", "resume_corpus"))
+RESUME_CORPUS_DIM = int(os.getenv("RESUME_CORPUS_DIM", "2048"))
+
+
+def vectorize(text, dim=RESUME_CORPUS_DIM):
+    # Hashed term vector with sublinear term frequency, L2-normalized.
+    # CRC32 is used because it is stable across processes, unlike hash().
+    vector = np.zeros(dim, dtype=np.float32)
+    tokens = tokenize(text)
+    if not tokens:
+        return vector
+    buckets = np.fromiter((zlib.crc32(token.encode("utf-8")) % dim for token in tokens), dtype=np.int64,
+                          count=len(tokens))
+    buckets, counts = np.unique(buckets, return_counts=True)
+    vector[buckets] = 1.0 + np.log(counts)
+    return vector / np.linalg.norm(vector)
+
+
+def _load_fields(stored):
+    return {key: Field(value, confidence) for key, (value, confidence) in json.loads(stored).items()}
+
+
+class ResumeCorpus:
+    # Row i of the vector file belongs to the resume stored with row = i.
+    # Rows are assigned inside a SQLite write transaction, which serializes
+    # writers across threads and processes, so the two files stay aligned.
+
+    def __init__(self, directory=RESUME_CORPUS_DIR, dim=RESUME_CORPUS_DIM):
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, f"vectors-{dim}.f32")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Memory map and document frequencies for the current number of rows
+        self._matrix = None
+        self._idf = None
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                " row INTEGER PRIMARY KEY,"
+                " sha256 TEXT NOT NULL UNIQUE,"
+                " name TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " fields TEXT NOT NULL,"
+                " added_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # One connection per thread; SQLite connections must not be shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, f"corpus-{self.dim}.sqlite3"), timeout=30,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def add(self, sha256, name, text, fields=None):
+        # Store a resume unless the same PDF is already in the corpus.
+        # Returns True when it was added.
+        fields = extract_fields(text) if fields is None else fields
+        vector = vectorize(text, self.dim)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM resumes WHERE sha256 = ?", (sha256,)).fetchone():
+                conn.execute("ROLLBACK")
+                return False
+            row = conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            with open(self.vectors_path, "ab") as f:
+                # Overwrites anything left past the last committed row by a writer that crashed
+                f.truncate(row * self.dim * 4)
+                f.write(vector.tobytes())
+            conn.execute(
+                "INSERT INTO resumes (row, sha256, name, text, fields, added_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (row, sha256, name, text,
+                 json.dumps({key: [field.value, field.confidence] for key, field in fields.items()}), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _vectors(self, rows):
+        # Memory-mapped (rows x dim) matrix and the IDF of every hash bucket,
+        # reopened only when the corpus has grown
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[0] != rows:
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+                # Smoothed IDF, so terms found in every resume still count
+                df = np.count_nonzero(self._matrix, axis=0)
+                self._idf = (np.log((rows + 1) / (df + 1)) + 1).astype(np.float32)
+            return self._matrix, self._idf
+
+    def search(self, jd, top_k):
+        # The top_k stored resumes closest to the JD as (sha256, name, text,
+        # fields), best first
+        rows = len(self)
+        if rows == 0 or top_k <= 0:
+            return []
+        matrix, idf = self._vectors(rows)
+        scores = matrix @ (vectorize(jd, self.dim) * idf)
+        top_k = min(top_k, rows)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        placeholders = ",".join("?" * len(best))
+        records = {
+            row: (sha256, name, text, _load_fields(fields))
+            for row, sha256, name, text, fields in self._connect().execute(
+                f"SELECT row, sha256, name, text, fields FROM resumes WHERE row IN ({placeholders})",
+                [int(row) for row in best],
+            )
+        }
+        return [records[int(row)] for row in best]
+
+    def stats(self):
+        entries = len(self)
+        return {"entries": entries, "vector_bytes": entries * self.dim * 4}
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_resume_corpus():
+    # Process-wide corpus instance shared by the portal sessions
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = ResumeCorpus()
+        return _corpus
@@ -0,0 +1,261 @@
+# Headless bulk screening from the command line, e.g. for overnight runs:
+#
+#   python screen_cli.py resumes/ --jd jd.txt --query "ATS >= 40 and CGPA >= 7"
+#
+# Uses the same extraction, scoring and filtering pipeline as the industry
+# portal. Finished files are appended to a JSONL manifest as they complete
+# (scored ones in groups, so the query is applied to many rows at once);
+# when the command is restarted after a crash or interruption, files already
+# finished in the manifest are skipped. Files are matched by content
+# (SHA-256), so a resume finished under another path or taken from the
+# corpus is not screened again.
+#
+# Each run starts with a header record holding hashes of the JD and the
+# query. A manifest belongs to one JD: running it against another JD is
+# refused. When only the query changed, the stored results are filtered
+# again and recorded under the new query, without scoring anything.
+#
+# Screened files are also saved to the resume corpus, so a later run can
+# screen the best stored matches for a new JD without the PDFs:
+#
+#   python screen_cli.py --corpus-top 200 --jd new_jd.txt --query "..."
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from field_extractor import extract_fields
+from llm_backend import BACKENDS, LLMBackendError, generate_text, get_backend
+from metrics import diagnostics_rows, diagnostics_summary, span, track
+from pdf_text import extract_many
+from rate_limit import get_rate_controller
+from result_filters import FilterSyntaxError, compile_query, searchable
+from resume_corpus import get_resume_corpus
+from screening import DEFAULT_BATCH_SIZE, DEFAULT_MAX_WORKERS, ScreeningJob
+
+# Statuses that mean a file needs no more work; "error" records are retried.
+# Every scored record keeps its full result, so matched/not_matched can be
+# recomputed for another query without scoring again.
+FINISHED_STATUSES = {"matched", "not_matched", "skipped_prerank"}
+# Scored rows are filtered and written to the manifest in groups of this size;
+# a crash loses at most one group, whose answers are still in the LLM cache
+MANIFEST_FLUSH_ROWS = 100
+
+
+def find_pdfs(inputs):
+    # Expand directories (recursively) and glob patterns into a sorted list of PDF paths
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True)
+            matches += glob.glob(os.path.join(item, "**", "*.PDF"), recursive=True)
+        elif glob.has_magic(item):
+            matches = glob.glob(item, recursive=True)
+        else:
+            matches = [item]
+        paths.update(os.path.normpath(path) for path in matches if os.path.isfile(path))
+    return sorted(paths)
+
+
+def text_hash(text):
+    # Hash of a JD or query, insensitive to whitespace changes
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def load_manifest(manifest_path, jd_hash):
+    # (JD hash of the last run header or None, {sha256: latest finished
+    # record for this JD}) of a previous run's manifest
+    manifest_jd = None
+    finished = {}
+    if not os.path.exists(manifest_path):
+        return manifest_jd, finished
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; that file will simply be redone
+                continue
+            if record.get("type") == "run":
+                manifest_jd = record.get("jd_sha256")
+            elif (record.get("status") in FINISHED_STATUSES and record.get("sha256")
+                  and record.get("jd_sha256") == jd_hash):
+                finished[record["sha256"]] = record
+    return manifest_jd, finished
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory of PDF resumes against a job description.")
+    parser.add_argument("inputs", nargs="*", help="PDF files, directories or glob patterns")
+    parser.add_argument("--jd", required=True, help="Text file with the job description")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--query", help="Recruiter query, as entered in the industry portal")
+    query.add_argument("--query-file", help="Text file with the recruiter query")
+    parser.add_argument("--manifest", default="screening_manifest.jsonl",
+                        help="JSONL file that results are appended to (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Resumes extracted and scored at the same time (default: %(default)s)")
+    parser.add_argument("--top-k", type=int, default=0, help="Only send the K best locally ranked resumes to Gemini")
+    parser.add_argument("--min-local-score", type=float, default=0,
+                        help="Only send resumes with at least this local match score (0-100) to Gemini")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help=f"Score up to N resumes per Gemini request, e.g. {DEFAULT_BATCH_SIZE} (default: one per request)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="Model backend; \"fake\" runs offline (default: $LLM_BACKEND or gemini)")
+    parser.add_argument("--model", help="Model name (default: $LLM_MODEL or the backend's default)")
+    parser.add_argument("--corpus-top", type=int, default=0,
+                        help="Also screen the N stored corpus resumes that best match the JD")
+    parser.add_argument("--no-corpus", action="store_true", help="Do not save the screened files to the resume corpus")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.corpus_top:
+        parser.error("give PDF inputs, --corpus-top, or both")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    load_dotenv()
+    try:
+        backend = get_backend(args.backend, args.model)
+    except LLMBackendError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    with open(args.jd, "r", encoding="utf-8") as f:
+        jd = f.read()
+    if args.query_file:
+        with open(args.query_file, "r", encoding="utf-8") as f:
+            query = f.read().strip()
+    else:
+        query = args.query
+    try:
+        query_filter = compile_query(query)
+    except FilterSyntaxError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        return 2
+
+    jd_hash = text_hash(jd)
+    query_hash = text_hash(query_filter.source)
+    manifest_jd, finished = load_manifest(args.manifest, jd_hash)
+    if manifest_jd is not None and manifest_jd != jd_hash:
+        print(f"{args.manifest} holds results for a different job description; "
+              f"pass --manifest to start a new one", file=sys.stderr)
+        return 2
+    paths = find_pdfs(args.inputs)
+    job = ScreeningJob(jd, max_workers=args.workers, top_k=args.top_k, min_local_score=args.min_local_score,
+                       batch_size=args.batch_size or None, generate=lambda prompt, schema=None: generate_text(prompt.text, backend, schema=schema))
+    counts = {}
+
+    # Stage timings and token usage, recorded even if the run is interrupted
+    with track("cli", args.manifest) as run, open(args.manifest, "a", encoding="utf-8") as manifest:
+        manifest.write(json.dumps({"type": "run", "jd_sha256": jd_hash, "query_sha256": query_hash,
+                                   "query": query_filter.source, "started_at": time.time()}) + "\n")
+
+        def record(path, status, sha256=None, **fields):
+            entry = {"file": path, "sha256": sha256 or hashes.get(path), "jd_sha256": jd_hash,
+                     "query_sha256": query_hash, "status": status, "finished_at": time.time()}
+            entry.update(fields)
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            counts[status] = counts.get(status, 0) + 1
+
+        def is_finished(path):
+            return hashes.get(path) in finished
+
+        # Extraction is cached on disk, so re-reading finished files on restart is cheap
+        # and keeps pre-ranking consistent across runs
+        print(f"Extracting text from {len(paths)} PDFs...", file=sys.stderr)
+        hashes = {}
+        resumes = []
+        corpus = get_resume_corpus()
+        for path, (sha256, resume_text, error) in zip(paths, extract_many(paths)):
+            hashes[path] = sha256
+            if error is not None:
+                record(path, "error", error=f"Error reading {path}: {error}")
+            elif resume_text:
+                # Fields are extracted once, for screening and for the corpus
+                fields = extract_fields(resume_text)
+                resumes.append((path, resume_text, fields))
+                if not args.no_corpus:
+                    corpus.add(sha256, os.path.basename(path), resume_text, fields)
+        if args.corpus_top:
+            # Stored resumes are recorded by file name; ones given as inputs are not screened twice,
+            # and ones finished in earlier runs are skipped by their hash like any other file
+            screened = set(hashes.values())
+            shortlisted = 0
+            for sha256, name, resume_text, fields in corpus.search(jd, args.corpus_top):
+                if sha256 not in screened and name not in hashes:
+                    hashes[name] = sha256
+                    resumes.append((name, resume_text, fields))
+                    shortlisted += 1
+            print(f"Shortlisted {shortlisted} stored resumes from the corpus of {len(corpus)}", file=sys.stderr)
+
+        candidates, skipped = job.prepare(resumes)
+        for path in skipped:
+            if not is_finished(path):
+                record(path, "skipped_prerank")
+
+        # Results scored under another query are filtered again instead of being re-scored
+        refilter = [entry for entry in finished.values()
+                    if entry["status"] != "skipped_prerank" and entry.get("query_sha256") != query_hash]
+        if refilter:
+            with span("filter"):
+                matched = query_filter.mask(searchable(pd.DataFrame([entry["result"] for entry in refilter])))
+            for entry, is_match in zip(refilter, matched.tolist()):
+                record(entry["file"], "matched" if is_match else "not_matched", sha256=entry["sha256"],
+                       local_score=entry.get("local_score"), result=entry["result"], error=entry.get("error"))
+            print(f"Filtered {len(refilter)} stored results with the new query", file=sys.stderr)
+
+        todo = [candidate for candidate in candidates if not is_finished(candidate.name)]
+        print(f"{len(candidates) - len(todo)} already finished, scoring {len(todo)} resumes...", file=sys.stderr)
+        # Scored (candidate, result, parse error) waiting for the query and the manifest
+        pending = []
+
+        def record_scored():
+            with span("filter"):
+                matched = query_filter.mask(searchable(pd.DataFrame([result for _, result, _ in pending])))
+            for (candidate, result, parse_error), is_match in zip(pending, matched.tolist()):
+                record(candidate.name, "matched" if is_match else "not_matched",
+                       local_score=candidate.local_score, result=result,
+                       error=f"Failed to parse JSON: {parse_error}" if parse_error is not None else None)
+            pending.clear()
+
+        try:
+            for done, outcome in enumerate(job.iter_scored(todo), start=1):
+                candidate = outcome.item
+                if not outcome.ok:
+                    record(candidate.name, "error", local_score=candidate.local_score,
+                           error=f"Error processing {candidate.name}: {outcome.error}")
+                else:
+                    result, parse_error = job.evaluate(candidate, outcome.value)
+                    pending.append((candidate, result, parse_error))
+                    if len(pending) >= MANIFEST_FLUSH_ROWS:
+                        record_scored()
+                print(f"[{done}/{len(todo)}] {candidate.name}", file=sys.stderr)
+        finally:
+            # Also on interruption, so rows already scored are not redone
+            if pending:
+                record_scored()
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "nothing to do"
+    print(f"Done: {summary}. Results in {args.manifest}", file=sys.stderr)
+    rate_stats = get_rate_controller(backend.name).stats()
+    print(f"API calls: {rate_stats['calls']}, {rate_stats['throttled']} rate limited, {rate_stats['retries']} retries "
+          f"({rate_stats['backoff_seconds']:.1f}s backoff), {rate_stats['failures']} failed", file=sys.stderr)
+    diagnostics = run.summary()
+    print(diagnostics_summary(diagnostics), file=sys.stderr)
+    for row in diagnostics_rows(diagnostics):
+        print(f"  {row['Stage']:<12} {row['Seconds']:>9.3f}s  {row['Count']:>6}x", file=sys.stderr)
+    return 1 if counts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+# Bulk screening pipeline shared by the industry portal and the CLI.
+# Work for each resume (PDF extraction + Gemini scoring) runs on a bounded
+# thread pool; results come back as they finish, with errors isolated per file.
+#
+# Screening has two stages. Scoring depends only on the JD and the resume
+# (ATS score and candidate facts), so its requests are cached across
+# queries; the recruiter's query is then applied locally to the scored rows
+# by result_filters, so changing a threshold or college makes no API calls.
+
+import contextvars
+import json
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from field_extractor import extract_fields
+from json_repair import clean_json_response, parse_json, parse_json_object
+from llm_backend import generate_text
+from metrics import timed
+from prerank import local_scores, shortlist
+from prompt_builder import PROMPT_MAX_TOKENS, PromptSection, build_prompt, estimate_tokens
+
+DEFAULT_MAX_WORKERS = int(os.getenv("SCREENING_MAX_WORKERS", "8"))
+
+
+class ItemResult:
+    # Outcome of processing one input item: either a value or the raised error
+    def __init__(self, index, item, value=None, error=None):
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _run_one(func, index, item):
+    try:
+        return ItemResult(index, item, value=func(item))
+    except Exception as e:
+        return ItemResult(index, item, error=e)
+
+
+def iter_concurrently(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    # Apply func to every item with at most max_workers calls in flight and
+    # yield each ItemResult as soon as it is ready (completion order), so
+    # callers can show progress while the rest are still running. A failure
+    # in one item never affects the others. Items are submitted a few at a
+    # time, so closing the generator early (Stop in the portal, Ctrl-C in
+    # the CLI) only waits for the calls already running.
+    items = list(items)
+    if not items:
+        return
+    max_workers = max(1, min(int(max_workers), len(items)))
+    queued = iter(enumerate(items))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        running = set()
+        while True:
+            for i, item in queued:
+                # Workers see the caller's context, e.g. its metrics run
+                running.add(executor.submit(contextvars.copy_context().run, _run_one, func, i, item))
+                if len(running) >= max_workers * 2:
+                    break
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def pack_batches(sizes, max_size, max_items):
+    # Greedily group consecutive items into batches whose total size stays
+    # within max_size and whose length stays within max_items. Long items
+    # therefore end up in small batches; an item larger than max_size on its
+    # own gets a batch of one. Returns lists of item indices.
+    batches = []
+    current = []
+    current_size = 0
+    for index, size in enumerate(sizes):
+        if current and (current_size + size > max_size or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_size = 0
+        current.append(index)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+DEFAULT_BATCH_SIZE = 5
+# Estimated tokens for the instructions of a batch request, excluding JD and resumes
+BATCH_PROMPT_OVERHEAD_TOKENS = 500
+
+# Prompt instruction and JSON key description for the score and each field the model may be asked for
+SCORE_PROMPTS = {
+    "ATS Score": ("- Calculate the ATS match score as a numeric percentage (0 to 100).",
+                  '- "ATS Score": (numeric percentage or "N/A")'),
+}
+FIELD_PROMPTS = {
+    "College": ("- Identify the candidate's College.", '- "College": (the name of the college or "N/A")'),
+    "CGPA": ("- Extract the candidate's CGPA.", '- "CGPA": (numeric value or "N/A")'),
+    "Certifications": ("- List any Certifications.", '- "Certifications": (a list of certifications or "N/A")'),
+    "Candidate Email": ("- Provide the candidate's Email.", '- "Candidate Email": (the candidate\'s email or "N/A")'),
+}
+
+PROMPT_LINES = {**SCORE_PROMPTS, **FIELD_PROMPTS}
+
+# Response schema for each key (OpenAPI subset used by Gemini's JSON mode);
+# values the model cannot find come back as null and are shown as "N/A"
+KEY_SCHEMAS = {
+    "File Name": {"type": "string"},
+    "ATS Score": {"type": "number", "nullable": True},
+    "College": {"type": "string", "nullable": True},
+    "CGPA": {"type": "number", "nullable": True},
+    "Certifications": {"type": "array", "items": {"type": "string"}, "nullable": True},
+    "Candidate Email": {"type": "string", "nullable": True},
+}
+
+PARSING_ERROR_RESPONSE = {
+    "ATS Score": "N/A",
+    "College": "N/A",
+    "CGPA": "N/A",
+    "Certifications": "N/A",
+    "Candidate Email": "N/A"
+}
+
+
+def get_llm_response(prompt, schema=None):
+    # Configured backend (see llm_backend), served from the shared response cache when possible
+    return generate_text(prompt.text, schema=schema)
+
+
+def response_schema(keys):
+    return {
+        "type": "object",
+        "properties": {key: KEY_SCHEMAS[key] for key in keys},
+        "required": list(keys),
+    }
+
+
+def missing_keys(record, keys):
+    # Keys the answer did not provide in a usable form
+    missing = []
+    for key in keys:
+        value = record.get(key)
+        if key == "ATS Score":
+            # null or "N/A" is the model's answer that there is no score, so
+            # it is not asked again; float(True) is 1.0, so booleans are
+            # rejected explicitly
+            if key in record and (value is None or str(value).strip().upper() == "N/A"):
+                usable = True
+            else:
+                try:
+                    float(value)
+                    usable = not isinstance(value, bool)
+                except (TypeError, ValueError):
+                    usable = False
+        else:
+            usable = key in record
+        if not usable:
+            missing.append(key)
+    return missing
+
+
+def _field_prompt_lines(field_names):
+    field_instructions = "".join(PROMPT_LINES[name][0] + "\n" for name in field_names)
+    field_keys = "".join(PROMPT_LINES[name][1] + "\n" for name in field_names)
+    return field_instructions, field_keys
+
+
+class Candidate:
+    # A resume that passed local checks and is waiting for (or has) a Gemini score
+    def __init__(self, name, resume_text, fields, local_score):
+        self.name = name
+        self.resume_text = resume_text
+        self.fields = fields
+        self.local_score = local_score
+
+    def missing_fields(self):
+        # Fields that were not found reliably and must be asked from the model
+        return [name for name, field in self.fields.items() if not field.confident]
+
+
+class ScreeningJob:
+    # Bulk scoring of resumes against one JD, independent of the recruiter's
+    # query. Shared by the industry portal and the command-line screener; it
+    # holds no UI code, so callers decide how to report progress and errors.
+
+    def __init__(self, jd, max_workers=DEFAULT_MAX_WORKERS, top_k=None, min_local_score=None,
+                 batch_size=None, generate=get_llm_response):
+        self.jd = jd
+        self.max_workers = max_workers
+        self.top_k = top_k
+        self.min_local_score = min_local_score
+        self.batch_size = batch_size
+        self.generate = generate
+        # Every prompt sent to the model; appended from worker threads
+        self.prompts_sent = []
+
+    @timed("prerank")
+    def prepare(self, resumes):
+        # Run the local stages on (name, resume_text) pairs, or (name,
+        # resume_text, fields) when the fields were extracted before (e.g.
+        # when the resume was stored in the corpus). Returns the candidates
+        # to send to Gemini (in input order) and the names left out by
+        # pre-ranking.
+        # Email, CGPA, College and Certifications are extracted locally, so
+        # the model is only asked for the ones that could not be found
+        kept = [(name, resume_text, fields[0] if fields else extract_fields(resume_text))
+                for name, resume_text, *fields in resumes]
+
+        # Rank all resumes locally against the JD and only send the shortlist to Gemini
+        local_match = local_scores(self.jd, [resume_text for _, resume_text, _ in kept])
+        selected = set(shortlist(local_match, top_k=self.top_k or None, min_score=self.min_local_score or None))
+        candidates = []
+        skipped = []
+        for i, (name, resume_text, fields) in enumerate(kept):
+            if i in selected:
+                candidates.append(Candidate(name, resume_text, fields, float(local_match[i])))
+            else:
+                skipped.append(name)
+        return candidates, skipped
+
+    def _resume_sections(self, candidate):
+        # The JD and resume are included once, as named sections
+        return [
+            PromptSection("role", "You are an expert recruiter. Evaluate the resume against the job description."),
+            PromptSection("jd", self.jd, heading="Given the job description"),
+            PromptSection(candidate.name, candidate.resume_text, heading="And the resume content", truncatable=True),
+        ]
+
+    def score_resume(self, candidate):
+        # Score a single resume; runs on a worker thread, so errors are raised
+        # and reported per file by the caller
+        field_instructions, field_keys = _field_prompt_lines(candidate.missing_fields())
+
+        # New prompt: instruct the model to return all required details
+        prompt = build_prompt(self._resume_sections(candidate) + [
+            PromptSection("task", f"""
+Based on the above, please:
+- Calculate the ATS match score as a numeric percentage (0 to 100).
+{field_instructions}
+Return your answer strictly in JSON format with only these keys:
+- "ATS Score": (numeric percentage or "N/A")
+{field_keys}
+Ensure the JSON is valid.
+            """),
+        ])
+        self.prompts_sent.append(prompt)
+        keys = ["ATS Score"] + candidate.missing_fields()
+        return self.complete(candidate, self.generate(prompt, response_schema(keys)))
+
+    def ask_missing(self, candidate, keys):
+        # Follow-up request for only the keys a previous answer lacked
+        field_instructions, field_keys = _field_prompt_lines(keys)
+        prompt = build_prompt(self._resume_sections(candidate) + [
+            PromptSection("task", f"""
+Based on the above, please:
+{field_instructions}
+Return your answer strictly in JSON format with only these keys:
+{field_keys}
+Ensure the JSON is valid.
+            """),
+        ])
+        self.prompts_sent.append(prompt)
+        return parse_json_object(self.generate(prompt, response_schema(keys)))
+
+    def complete(self, candidate, response_text):
+        # Repair the answer locally and re-ask only for the keys that are
+        # still missing, so a paid call is not thrown away. Returns the
+        # completed answer as JSON, or the original text when no usable
+        # answer could be recovered.
+        keys = ["ATS Score"] + candidate.missing_fields()
+        try:
+            record = parse_json_object(response_text)
+        except ValueError:
+            record = {}
+        missing = missing_keys(record, keys)
+        if missing:
+            try:
+                extra = self.ask_missing(candidate, missing)
+            except ValueError:
+                extra = {}
+            except Exception:
+                # The follow-up is optional: when it fails (e.g. rate limited
+                # after its retries) the first answer is kept as it is, unless
+                # it had nothing usable either
+                if not record:
+                    raise
+                extra = {}
+            record.update({key: extra[key] for key in missing if key in extra})
+        if not record:
+            return response_text
+        return json.dumps(record)
+
+    def score_batch(self, batch, indices=None):
+        # Score several resumes in one request; incomplete entries in the batch
+        # answer are completed with a follow-up for the missing keys, and
+        # resumes missing from it (or all of them, when the answer cannot be
+        # parsed) are re-scored with single-resume calls. indices are the
+        # candidates' positions in the input, used for ItemResult.index.
+        indices = range(len(batch)) if indices is None else indices
+        names = [candidate.name for candidate in batch]
+        missing = sorted({name for candidate in batch for name in candidate.missing_fields()},
+                         key=list(FIELD_PROMPTS).index)
+        field_instructions, field_keys = _field_prompt_lines(missing)
+
+        sections = [
+            PromptSection("role", "You are an expert recruiter. Evaluate each resume below against the job description."),
+            PromptSection("jd", self.jd, heading="Given the job description"),
+        ]
+        for candidate in batch:
+            sections.append(PromptSection(candidate.name, candidate.resume_text,
+                                          heading=f'Resume "{candidate.name}"', truncatable=True))
+        sections.append(PromptSection("task", f"""
+For each resume above, please:
+- Calculate the ATS match score as a numeric percentage (0 to 100).
+{field_instructions}
+Return your answer strictly as a JSON array with one object per resume, each with only these keys:
+- "File Name": (the resume's file name exactly as given above)
+- "ATS Score": (numeric percentage or "N/A")
+{field_keys}
+Ensure the JSON is valid.
+        """))
+
+        try:
+            prompt = build_prompt(sections)
+            self.prompts_sent.append(prompt)
+            schema = {"type": "array", "items": response_schema(["File Name", "ATS Score"] + missing)}
+            response_text = self.generate(prompt, schema)
+        except Exception as e:
+            # An oversized prompt, or an API error that outlasted its retries,
+            # would only repeat for every resume of the batch
+            return [ItemResult(index, candidate, error=e) for index, candidate in zip(indices, batch)]
+
+        entries = {}
+        try:
+            answer = parse_json(response_text)
+        except ValueError:
+            answer = None
+        for entry in answer if isinstance(answer, list) else []:
+            if isinstance(entry, dict) and names.count(entry.get("File Name")) == 1:
+                entries[entry["File Name"]] = json.dumps(entry)
+
+        results = []
+        for index, candidate in zip(indices, batch):
+            if candidate.name in entries:
+                results.append(_run_one(lambda c: self.complete(c, entries[c.name]), index, candidate))
+            else:
+                results.append(_run_one(self.score_resume, index, candidate))
+        return results
+
+    def iter_scored(self, candidates):
+        # Generator over scored candidates, yielded as soon as each one is
+        # ready; ItemResult.item is the Candidate, .value the raw response
+        if self.batch_size:
+            overhead = estimate_tokens(self.jd) + BATCH_PROMPT_OVERHEAD_TOKENS
+            batches = pack_batches([estimate_tokens(candidate.resume_text) for candidate in candidates],
+                                   max_size=PROMPT_MAX_TOKENS - overhead, max_items=self.batch_size)
+            score = lambda batch: self.score_batch([candidates[i] for i in batch], batch)
+            for batch_outcome in iter_concurrently(score, batches, max_workers=self.max_workers):
+                if batch_outcome.ok:
+                    yield from batch_outcome.value
+                else:
+                    for i in batch_outcome.item:
+                        yield ItemResult(i, candidates[i], error=batch_outcome.error)
+        else:
+            yield from iter_concurrently(self.score_resume, candidates, max_workers=self.max_workers)
+
+    def evaluate(self, candidate, response_text):
+        # Parse the model's answer into a result row (before any query
+        # criteria are applied). Returns (row, parse error or None)
+        parse_error = None
+        cleaned_response = clean_json_response(response_text)
+        try:
+            parsed_response = parse_json_object(response_text)
+        except ValueError as e:
+            parse_error = e
+            parsed_response = dict(PARSING_ERROR_RESPONSE)
+
+        # Schema-constrained answers use null for values that were not found
+        for name, value in parsed_response.items():
+            if value is None:
+                parsed_response[name] = "N/A"
+
+        # Locally extracted fields take precedence over the model's answer
+        for name, field in candidate.fields.items():
+            if field.confident:
+                parsed_response[name] = field.value
+
+        # If ATS Score is missing or "N/A", attempt to extract a percentage from the response text
+        ats = str(parsed_response.get("ATS Score", "")).strip()
+        if ats.upper() == "N/A" or ats == "":
+            match_percentage = re.search(r"(\d+(\.\d+)?)\s*%", cleaned_response)
+            if match_percentage:
+                parsed_response["ATS Score"] = match_percentage.group(1)
+
+        return {
+            "File Name": candidate.name,
+            "Local Score": candidate.local_score,
+            "ATS Score": parsed_response.get("ATS Score", "N/A"),
+            "College": parsed_response.get("College", "N/A"),
+            "CGPA": parsed_response.get("CGPA", "N/A"),
+            "Certifications": parsed_response.get("Certifications", "N/A"),
+            "Candidate Email": parsed_response.get("Candidate Email", "N/A")
+        }, parse_error
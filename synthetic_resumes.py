@@ -0,0 +1,119 @@
+# Synthetic resume PDFs for benchmarks and offline runs.
+# Resumes are generated from a seed, so the same arguments always produce the
+# same bytes. Page count and words per page control the size of each file;
+# the text has the sections, contact details, CGPA, college and
+# certifications that field extraction and pre-ranking look for.
+
+import os
+import random
+
+FIRST_NAMES = ["Aarav", "Ananya", "Rohan", "Priya", "Vikram", "Sneha", "Arjun", "Meera", "Kabir", "Isha", "Dev", "Riya"]
+LAST_NAMES = ["Sharma", "Iyer", "Das", "Banerjee", "Reddy", "Gupta", "Nair", "Mehta", "Sen", "Kapoor", "Rao", "Bose"]
+COLLEGES = [
+    "Indian Institute of Technology Delhi",
+    "National Institute of Technology Trichy",
+    "Meghnad Saha Institute of Technology",
+    "Jadavpur University",
+    "Vellore Institute of Technology",
+    "Heritage Institute of Technology",
+    "Anna University",
+    "Amity University",
+]
+CERTIFICATIONS = [
+    "AWS Certified Solutions Architect",
+    "Google Cloud Professional Data Engineer",
+    "Microsoft Certified: Azure Fundamentals",
+    "Certified Kubernetes Administrator",
+    "TensorFlow Developer Certificate",
+    "Oracle Certified Java Programmer",
+]
+SKILLS = [
+    "python", "java", "sql", "aws", "azure", "docker", "kubernetes", "react", "node", "pandas", "spark", "tensorflow",
+    "pytorch", "excel", "tableau", "linux", "git", "django", "flask", "fastapi", "kafka", "airflow", "terraform",
+    "mongodb", "postgresql", "redis", "scikit-learn", "nlp", "computer vision", "microservices",
+]
+FILLER = [
+    "built", "designed", "led", "improved", "deployed", "automated", "reduced", "latency", "pipeline", "service",
+    "dashboard", "customers", "team", "platform", "data", "model", "accuracy", "cost", "scalable", "reliable",
+    "migrated", "monitoring", "testing", "api", "release", "users", "workflow", "analysis", "reporting", "features",
+]
+LINE_WIDTH = 90
+
+
+def resume_lines(rng, index, words):
+    # Text lines of one resume with roughly the given number of words
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, 8)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{index}@example.com | +91 98{index:08d}"[:80],
+        "Education",
+        rng.choice(COLLEGES),
+        f"B.Tech in Computer Science, CGPA: {rng.uniform(6.0, 9.9):.2f}/10",
+        "Skills",
+        ", ".join(skills),
+        "Certifications",
+        *rng.sample(CERTIFICATIONS, rng.randint(1, 3)),
+        "",
+        "Experience",
+    ]
+    count = sum(len(line.split()) for line in lines)
+    line = []
+    while count < words:
+        line.append(rng.choice(skills) if rng.random() < 0.2 else rng.choice(FILLER))
+        count += 1
+        if len(" ".join(line)) >= LINE_WIDTH:
+            lines.append(" ".join(line))
+            line = []
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages):
+    # Minimal PDF 1.4 document with one Helvetica text stream per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("ascii"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, lines in enumerate(pages):
+        stream = ("BT /F1 10 Tf 50 760 Td 12 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET")
+        stream = stream.encode("latin-1", "replace")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {5 + 2 * i} 0 R >>".encode("ascii"))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_resume_pdf(index, pages=1, words_per_page=350, seed=0):
+    # Bytes of synthetic resume number index
+    rng = random.Random(f"{seed}:{index}")
+    lines = resume_lines(rng, index, pages * words_per_page)
+    per_page = -(-len(lines) // pages)
+    return build_pdf([lines[page * per_page:(page + 1) * per_page] for page in range(pages)])
+
+
+def write_resumes(directory, count, pages=1, words_per_page=350, seed=0):
+    # Write count synthetic resumes into directory; returns their paths
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"resume_{index:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_resume_pdf(index, pages=pages, words_per_page=words_per_page, seed=seed))
+        paths.append(path)
+    return paths
@@ -0,0 +1,73 @@
+import pytest
+
+from json_repair import clean_json_response, parse_json, parse_json_object
+from screening import missing_keys
+
+
+def test_markdown_fences_are_removed():
+    assert clean_json_response('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert parse_json('```json\n{"a": 1}\n```') == {"a": 1}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Here is the result: {"a": 1} Hope this helps.', {"a": 1}),
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('{"a": True, "b": None}', {"a": True, "b": None}),
+    ("{'a': 'x'}", {"a": "x"}),
+    ("{“a”: “x”}", {"a": "x"}),
+])
+def test_small_defects_are_repaired(text, expected):
+    assert parse_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"ATS Score": 70, "College": "IIT"', {"ATS Score": 70, "College": "IIT"}),
+    ('{"ATS Score": 70,', {"ATS Score": 70}),
+    ('{"ATS Score": 70, "College":', {"ATS Score": 70}),
+    ('{"ATS Score": 70, "Col', {"ATS Score": 70}),
+    ('{"a": [1, 2', {"a": [1, 2]}),
+    ('["a", "b', ["a"]),
+])
+def test_truncated_answers_are_closed(text, expected):
+    assert parse_json(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '{"ATS Score": 70, "College": "II',
+    '{"ATS Score": 70, "College": "I\\"I',
+    '{"ATS Score": 70, "College": ["IIT", "NI',
+])
+def test_a_value_cut_off_mid_string_is_dropped(text):
+    # Keeping the fragment would pass it off as the real value
+    record = parse_json(text)
+    assert record == {"ATS Score": 70}
+    assert missing_keys(record, ["ATS Score", "College"]) == ["College"]
+
+
+def test_cut_off_batch_entry_is_dropped():
+    assert parse_json('[{"File Name": "a", "ATS Score": 5}, {"File Name": "b') == [
+        {"File Name": "a", "ATS Score": 5}, {}]
+
+
+def test_nothing_usable_raises():
+    with pytest.raises(ValueError):
+        parse_json("I could not evaluate this resume.")
+
+
+def test_parse_json_object():
+    assert parse_json_object('[{"a": 1}]') == {"a": 1}
+    with pytest.raises(ValueError):
+        parse_json_object("[1, 2]")
+
+
+@pytest.mark.parametrize("record, missing", [
+    ({"ATS Score": 72}, []),
+    ({"ATS Score": "72"}, []),
+    ({"ATS Score": None}, []),
+    ({"ATS Score": "N/A"}, []),
+    ({"ATS Score": True}, ["ATS Score"]),
+    ({"ATS Score": "high"}, ["ATS Score"]),
+    ({}, ["ATS Score"]),
+])
+def test_missing_ats_score(record, missing):
+    assert missing_keys(record, ["ATS Score"]) == missing
@@ -0,0 +1,120 @@
+import pytest
+
+from rate_limit import RateController, is_rate_limited, is_transient
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+def controller(**kwargs):
+    kwargs.setdefault("max_in_flight", 16)
+    kwargs.setdefault("initial_in_flight", 8)
+    kwargs.setdefault("base_delay", 0)
+    return RateController(**kwargs)
+
+
+def test_error_classification():
+    assert is_rate_limited(ApiError(429))
+    assert not is_rate_limited(ApiError(503))
+    assert is_transient(ApiError(503))
+    assert is_transient(ConnectionError())
+    assert not is_transient(ApiError(400))
+
+
+def test_limit_starts_at_the_initial_value_within_bounds():
+    assert controller().limit == 8
+    assert controller(initial_in_flight=32).limit == 16
+    assert controller(initial_in_flight=0).limit == 1
+
+
+def test_rate_limits_halve_the_limit_once_per_epoch():
+    rate = controller()
+    epochs = [rate._acquire() for _ in range(8)]
+    # Every call in flight hits the rate limit; only the first one cuts the limit
+    for epoch in epochs:
+        rate._release(epoch, ApiError(429))
+    assert rate.limit == 4
+    assert rate.throttled == 8
+    # A call started after the cut belongs to the new epoch and cuts again
+    rate._release(rate._acquire(), ApiError(429))
+    assert rate.limit == 2
+
+
+def test_limit_never_drops_below_the_minimum():
+    rate = controller(initial_in_flight=2, min_in_flight=2)
+    rate._release(rate._acquire(), ApiError(429))
+    assert rate.limit == 2
+
+
+def test_limit_grows_by_one_per_window_only_while_saturated():
+    rate = controller(initial_in_flight=2)
+    # Two calls in flight fill the limit: each success then adds 1/limit
+    first, second = rate._acquire(), rate._acquire()
+    rate._release(first)
+    assert rate.limit == 2.5
+    third = rate._acquire()
+    rate._release(second)
+    assert rate.limit == pytest.approx(2.9)
+    # With one call left in flight the limit is not filled, so it stays put
+    rate._release(third)
+    assert rate.limit == pytest.approx(2.9)
+
+
+def test_call_retries_transient_errors_then_succeeds():
+    rate = controller()
+    answers = iter([ApiError(429), ApiError(503), "ok"])
+
+    def flaky():
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert rate.call(flaky) == "ok"
+    assert rate.stats()["retries"] == 2
+    assert rate.in_flight == 0
+
+
+def test_call_raises_other_errors_without_retrying():
+    rate = controller()
+    with pytest.raises(ApiError):
+        rate.call(lambda: (_ for _ in ()).throw(ApiError(400)))
+    assert rate.stats()["retries"] == 0
+
+
+def test_call_gives_up_after_max_retries():
+    rate = controller(max_retries=2)
+
+    def always_limited():
+        raise ApiError(429)
+
+    with pytest.raises(ApiError):
+        rate.call(always_limited)
+    stats = rate.stats()
+    assert (stats["calls"], stats["retries"], stats["failures"]) == (3, 2, 1)
+
+
+def test_stream_is_only_retried_before_the_first_chunk():
+    rate = controller()
+    attempts = []
+
+    def fails_before_output():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ApiError(503)
+        yield "a"
+        yield "b"
+
+    assert list(rate.stream(fails_before_output)) == ["a", "b"]
+    assert len(attempts) == 2
+
+    def fails_after_output():
+        yield "a"
+        raise ApiError(503)
+
+    with pytest.raises(ApiError):
+        list(rate.stream(fails_after_output))
+    assert rate.in_flight == 0
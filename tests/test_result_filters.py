@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from result_filters import FilterSyntaxError, ResultFilter, _tokenize, compile_query, searchable
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame([
+        {"File Name": "a.pdf", "Local Score": 90.0, "ATS Score": 75, "College": "IIT Delhi", "CGPA": 8.5,
+         "Certifications": ["AWS Certified"], "Candidate Email": "a@x.com"},
+        {"File Name": "b.pdf", "Local Score": 50.0, "ATS Score": "60", "College": "NIT Trichy", "CGPA": "N/A",
+         "Certifications": "N/A", "Candidate Email": "b@y.com"},
+        {"File Name": "c.pdf", "Local Score": 70.0, "ATS Score": 40, "College": "Jadavpur University", "CGPA": 7.2,
+         "Certifications": ["GCP"], "Candidate Email": "N/A"},
+    ])
+
+
+def names(query, df):
+    return list(compile_query(query).apply(df)["File Name"])
+
+
+def test_tokenize():
+    assert _tokenize('ATS >= 60% and college = "IIT Delhi"') == [
+        ("word", "ats"), ("op", ">="), ("number", 60.0), ("word", "and"),
+        ("word", "college"), ("op", "="), ("string", "IIT Delhi"),
+    ]
+
+
+def test_numeric_comparison_reads_numbers_stored_as_text(results):
+    assert names("ATS >= 60", results) == ["a.pdf", "b.pdf"]
+    assert names("ats score = 60", results) == ["b.pdf"]
+
+
+def test_and_binds_tighter_than_or(results):
+    assert names("ATS < 50 or ATS >= 70 and CGPA >= 8", results) == ["a.pdf", "c.pdf"]
+    assert names("(ATS < 50 or ATS >= 70) and CGPA >= 8", results) == ["a.pdf"]
+    assert names("ATS >= 50, CGPA >= 8", results) == ["a.pdf"]
+
+
+def test_missing_numbers_never_match_and_not_includes_them(results):
+    # "N/A" reads as NaN: no comparison holds, so its negation does
+    assert names("CGPA >= 0", results) == ["a.pdf", "c.pdf"]
+    assert names("not CGPA >= 8", results) == ["b.pdf", "c.pdf"]
+    assert names("CGPA != 8.5", results) == ["b.pdf", "c.pdf"]
+
+
+def test_text_conditions_ignore_case_and_search_lists(results):
+    assert names('certifications contains "aws"', results) == ["a.pdf"]
+    assert names('college in ["iit", "NIT"]', results) == ["a.pdf", "b.pdf"]
+    assert names("college not contains iit", results) == ["b.pdf", "c.pdf"]
+    assert names('college = "nit trichy"', results) == ["b.pdf"]
+    assert names("cgpa in [8.5, 7.2]", results) == ["a.pdf", "c.pdf"]
+
+
+def test_sort_and_top(results):
+    assert names("sort by ATS asc top 2", results) == ["c.pdf", "b.pdf"]
+    assert names("ATS >= 0", results) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert names("sort by college", results) == ["a.pdf", "c.pdf", "b.pdf"]
+
+
+def test_empty_query_keeps_every_row(results):
+    assert names("", results) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert compile_query("   ").predicate is None
+
+
+def test_free_text_fallback(results):
+    query = "Screen the resumes with ATS score more than 50%, who have graduated from top institutions like NIT"
+    assert names(query, results) == ["b.pdf"]
+
+
+def test_precomputed_view_gives_the_same_rows(results):
+    query_filter = compile_query("ATS >= 50 sort by ATS asc")
+    assert query_filter.apply(results, searchable(results)).equals(query_filter.apply(results))
+
+
+def test_empty_results():
+    assert ResultFilter().apply(pd.DataFrame()).empty
+
+
+@pytest.mark.parametrize("query, message", [
+    ("email contains @x.com", "Unexpected character '@' at position 15"),
+    ("ATS >=", "Expected a value at the end of the query"),
+    ("ATS >= 50 sort by", "Expected a field name at the end of the query"),
+    ("ATS > abc", "> needs a number, got 'abc'"),
+    ("salary > 3", "Unknown field 'salary'"),
+    ("top 0", "top needs a positive whole number"),
+    ("ATS >= 50 )", "Unexpected ')'"),
+    ("(ATS >= 50", "Expected ) at the end of the query"),
+    ("sort ATS", "Expected by, got 'ats'"),
+])
+def test_syntax_errors(query, message):
+    with pytest.raises(FilterSyntaxError) as error:
+        compile_query(query)
+    assert message in str(error.value)